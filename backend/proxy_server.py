@@ -1,224 +1,526 @@
-import socket
-import threading
-import struct
-import socketserver
-import time
-from typing import Optional, Tuple
-from backend.tor_handler import TorPoolManager
-from datetime import datetime
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-
-class HybridProxyHandler(socketserver.BaseRequestHandler):
-    
-    def setup(self):
-        self.pool_manager = self.server.pool_manager
-        self.log_callback = self.server.log_callback
-        self.timeout = 30  
-        self.request.settimeout(self.timeout)
-    
-    def log(self, message, color="#ffffff"):
-        if self.log_callback:
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            self.log_callback(f'<span style="color: {color};">[{timestamp}] {message}</span>')
-
-    def detect_protocol(self, first_byte: int) -> str:
-        if first_byte == 0x04:
-            return "SOCKS4"
-        elif first_byte == 0x05:
-            return "SOCKS5"
-        elif first_byte in (0x47, 0x48, 0x50, 0x43, 0x4F, 0x50): 
-            return "HTTP"
-        else:
-            return "UNKNOWN"
-
-    def relay_data(self, client_socket, remote_socket):
-        def forward(source, destination):
-            try:
-                while True:
-                    data = source.recv(8192)  
-                    if not data:
-                        break
-                    destination.sendall(data)
-            except:
-                pass
-            finally:
-                try:
-                    destination.shutdown(socket.SHUT_RDWR)
-                    destination.close()
-                except:
-                    pass
-
-        t1 = threading.Thread(target=forward, args=(client_socket, remote_socket), daemon=True)
-        t2 = threading.Thread(target=forward, args=(remote_socket, client_socket), daemon=True)
-        
-        t1.start()
-        t2.start()
-        
-        t1.join(timeout=30)  
-        t2.join(timeout=30)
-
-    def connect_to_tor(self, target_host, target_port):
-        """Tor SOCKS portuna baglanir - OPTİMİZE."""
-        tor_port = self.pool_manager.get_proxy_port()
-        if not tor_port:
-            return None
-
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(5) 
-            s.connect(('127.0.0.1', tor_port))
-            
-            s.sendall(b'\x05\x01\x00')
-            resp = s.recv(2)
-            if not resp or resp[1] != 0x00:
-                s.close()
-                return None
-            
-            host_bytes = target_host.encode()
-            req = struct.pack('>BB', 0x05, 0x01) + b'\x00' + \
-                  b'\x03' + struct.pack('>B', len(host_bytes)) + host_bytes + \
-                  struct.pack('>H', target_port)
-            
-            s.sendall(req)
-            
-            resp = s.recv(10)
-            if not resp or resp[1] != 0x00:
-                s.close()
-                return None
-            
-            return s
-        except Exception:
-            return None
-
-    def handle_http(self, data):
-        first_line = data.split(b'\r\n')[0].decode('utf-8', errors='ignore')
-        
-        if "GET /rotate" in first_line:
-            try:
-                instance = self.pool_manager.get_current_instance()
-                if not instance:
-                    self.request.sendall(b"HTTP/1.1 500 Internal Server Error\r\n\r\nNo active instance")
-                    return
-                
-                old_ip = instance.get_ip(max_retries=1, retry_delay=0)
-                if old_ip == "...":
-                    old_ip = "Hazırlanıyor"
-                
-                pool_size = len(self.pool_manager.instances)
-                
-                new_instance = self.pool_manager.switch_to_next_instance()
-                
-                new_ip = new_instance.get_ip(max_retries=1, retry_delay=0)
-                if new_ip == "...":
-                    new_ip = "Connecting..."
-                
-                elapsed_time = 0.1
-                if pool_size == 1:
-                    response_body = f"IP Renewal Started\nOld IP: {old_ip}\nPort: {new_instance.socks_port}\nNew IP: {new_ip}\nTime: {elapsed_time:.1f}s"
-                else:
-                    response_body = f"IP Rotation Started\nOld IP: {old_ip}\nNew Port: {new_instance.socks_port}\nNew IP: {new_ip}\nTime: {elapsed_time:.1f}s"
-                response = f"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: {len(response_body)}\r\n\r\n{response_body}"
-                self.request.sendall(response.encode())
-                
-            except Exception as e:
-                error_response = f"HTTP/1.1 500 Internal Server Error\r\n\r\nError: {str(e)}"
-                self.request.sendall(error_response.encode())
-            return
-
-        host = ""
-        port = 80
-        
-        parts = first_line.split(' ')
-        if len(parts) < 2:
-            return
-            
-        method = parts[0]
-        url = parts[1]
-        
-        if method == 'CONNECT':
-            try:
-                host, port_str = url.split(':')
-                port = int(port_str)
-            except:
-                return
-                
-            tor_sock = self.connect_to_tor(host, port)
-            if tor_sock:
-                self.request.sendall(b"HTTP/1.1 200 Connection Established\r\n\r\n")
-                self.relay_data(self.request, tor_sock)
-            else:
-                self.request.sendall(b"HTTP/1.1 502 Bad Gateway\r\n\r\n")
-                
-        else:
-            if 'http://' in url:
-                try:
-                    from urllib.parse import urlparse
-                    u = urlparse(url)
-                    host = u.hostname
-                    port = u.port or 80
-                except:
-                    pass
-            
-            if not host:
-                for line in data.split(b'\r\n'):
-                    if line.lower().startswith(b'host:'):
-                        host = line.split(b':', 1)[1].strip().decode()
-                        if ':' in host:
-                            host, port = host.split(':')
-                            port = int(port)
-                        break
-            
-            if host:
-                tor_sock = self.connect_to_tor(host, port)
-                if tor_sock:
-                    tor_sock.sendall(data) # Istegi aynen ilet
-                    self.relay_data(self.request, tor_sock)
-                else:
-                    self.request.sendall(b"HTTP/1.1 502 Bad Gateway\r\n\r\n")
-
-    def handle(self):
-        try:
-            header = self.request.recv(4096, socket.MSG_PEEK)
-            if not header:
-                return
-            
-            protocol = self.detect_protocol(header[0])
-            
-            if protocol == "HTTP":
-                data = self.request.recv(65536)
-                self.handle_http(data)
-                
-            elif protocol == "SOCKS5":
-                pass 
-                
-        except Exception:
-            pass
-        finally:
-            try:
-                self.request.close()
-            except:
-                pass
-
-class HybridProxyServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
-    allow_reuse_address = True
-    daemon_threads = True
-    
-    def __init__(self, pool_manager: TorPoolManager, host: str = '0.0.0.0', port: int = 8080, log_callback=None):
-        self.pool_manager = pool_manager
-        self.log_callback = log_callback
-        super().__init__((host, port), HybridProxyHandler)
-        self.running = False
-    
-    def serve_forever(self):
-        self.running = True
-        try:
-            super().serve_forever()
-        except:
-            pass
-        finally:
-            self.running = False
-
-    def stop(self):
-        self.shutdown()
-        self.server_close()
\ No newline at end of file
+import os
+import re
+import sys
+import socket
+import select
+import selectors
+import time
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from backend.tor_handler import TorPoolManager
+from datetime import datetime
+import asyncio
+from backend import io_uring_relay
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# splice(2) kernel-side forwarding is Linux-only and needs Python 3.10+.
+_SPLICE_AVAILABLE = sys.platform.startswith('linux') and hasattr(os, 'splice')
+_SPLICE_FLAGS = (os.SPLICE_F_MOVE | os.SPLICE_F_MORE) if _SPLICE_AVAILABLE else 0
+_PIPE_SIZE = 1 << 20
+_F_SETPIPE_SZ = 1031  # fcntl.F_SETPIPE_SZ, missing from older Pythons
+
+_RELAY_CHUNK = 65536
+
+# Compiled once; scanning the raw buffer beats splitting every header
+# line into a list just to find Host.
+_HOST_HEADER_RE = re.compile(rb'^host:[ \t]*([^\r\n]+)', re.IGNORECASE | re.MULTILINE)
+
+# First request byte -> protocol, one hash probe instead of chained
+# comparisons. G H P C O cover GET/HEAD/POST/PUT/PATCH/CONNECT/OPTIONS.
+_PROTOCOL_BY_FIRST_BYTE = {0x04: "SOCKS4", 0x05: "SOCKS5"}
+_PROTOCOL_BY_FIRST_BYTE.update({b: "HTTP" for b in (0x47, 0x48, 0x50, 0x43, 0x4F)})
+
+# Canned responses, encoded once at import instead of per request.
+_RESP_CONNECT_OK = b"HTTP/1.1 200 Connection Established\r\n\r\n"
+_RESP_BAD_GATEWAY = b"HTTP/1.1 502 Bad Gateway\r\n\r\n"
+_RESP_NO_INSTANCE = b"HTTP/1.1 500 Internal Server Error\r\n\r\nNo active instance"
+_RESP_ERROR_PREFIX = b"HTTP/1.1 500 Internal Server Error\r\n\r\nError: "
+_RESP_OK_HEADER = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: %d\r\n\r\n"
+
+# Socket buffer tuning: the kernel defaults are far below the pool's BDP and
+# force extra wakeups in the relay loop. Accepted sockets inherit the
+# listener's buffers on Linux.
+_LISTEN_BUF = 12 * 1024 * 1024
+_CONN_BUF = 4 * 1024 * 1024
+
+
+def _tune_socket(sock, bufsize=_CONN_BUF):
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, bufsize)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, bufsize)
+    except OSError:
+        pass
+
+
+def _shutdown_write(sock):
+    """Half-close for anything with a fileno().
+
+    asyncio hands out TransportSocket wrappers which dropped .shutdown();
+    a dup shares the file description, so shutting it down reaches the
+    real socket without taking over ownership of the fd.
+    """
+    try:
+        helper = socket.socket(fileno=os.dup(sock.fileno()))
+    except OSError:
+        return
+    try:
+        helper.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass
+    finally:
+        helper.close()
+
+
+class HybridProxyHandler:
+    """Per-connection coroutine handler (one asyncio task, zero threads)."""
+
+    def __init__(self, server: "HybridProxyServer", reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.server = server
+        self.pool_manager = server.pool_manager
+        self.log_callback = server.log_callback
+        self.reader = reader
+        self.writer = writer
+        self.timeout = 30
+        client_sock = writer.get_extra_info('socket')
+        if client_sock is not None:
+            _tune_socket(client_sock)
+
+    def log(self, message, color="#ffffff"):
+        if self.log_callback:
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            self.log_callback(f'<span style="color: {color};">[{timestamp}] {message}</span>')
+
+    def detect_protocol(self, first_byte: int) -> str:
+        return _PROTOCOL_BY_FIRST_BYTE.get(first_byte, "UNKNOWN")
+
+    @staticmethod
+    async def _flush_buffered(reader, writer):
+        """Forward bytes already sitting in a StreamReader's buffer.
+
+        The kernel relay only sees the raw fds; anything the transports
+        read before they were paused (a request-body tail that arrived
+        during the SOCKS round trip, a pipelined TLS hello) lives only in
+        the reader buffer and would be silently dropped otherwise.
+        StreamReader has no public peek, so this reaches for _buffer.
+        """
+        buffered = bytes(reader._buffer)
+        if buffered:
+            reader._buffer.clear()
+            writer.write(buffered)
+            await writer.drain()
+
+    async def relay_data(self, tor_reader, tor_writer):
+        if _SPLICE_AVAILABLE:
+            client_sock = self.writer.get_extra_info('socket')
+            tor_sock = tor_writer.get_extra_info('socket')
+            if client_sock is not None and tor_sock is not None:
+                # Stop the transports from reading so the kernel relay owns
+                # both fds, then run the blocking loop off the event loop.
+                self.writer.transport.pause_reading()
+                tor_writer.transport.pause_reading()
+                try:
+                    await self._flush_buffered(self.reader, tor_writer)
+                    await self._flush_buffered(tor_reader, self.writer)
+                    loop = asyncio.get_running_loop()
+                    executor = self.server.relay_executor
+                    if io_uring_relay.is_available():
+                        await loop.run_in_executor(executor, io_uring_relay.relay, client_sock, tor_sock)
+                    else:
+                        await loop.run_in_executor(executor, self._relay_splice_linux, client_sock, tor_sock)
+                except OSError:
+                    # splice unsupported for these fds. The stream relay
+                    # below waits on the readers, and a reader never
+                    # resumes a pause it didn't initiate — undo it here
+                    # or the portable path deadlocks.
+                    try:
+                        self.writer.transport.resume_reading()
+                        tor_writer.transport.resume_reading()
+                    except Exception:
+                        pass
+                else:
+                    # The transports still own both fds; closing the
+                    # writers is what actually releases them (and breaks
+                    # the protocol<->transport cycle on the Tor side).
+                    try:
+                        tor_writer.close()
+                    except Exception:
+                        pass
+                    return
+        await self._relay_streams(tor_reader, tor_writer)
+
+    def _relay_splice_linux(self, client_socket, remote_socket):
+        """Kernel-side bidirectional forwarding via splice(2).
+
+        One selector loop drives both directions. Each direction gets its own
+        pipe; bytes go socket->pipe->socket without ever being copied into
+        userspace.
+        """
+        pipes = {}
+        sel = selectors.DefaultSelector()
+        try:
+            for src, dst in ((client_socket, remote_socket), (remote_socket, client_socket)):
+                pipe_r, pipe_w = os.pipe()
+                if fcntl is not None:
+                    try:
+                        fcntl.fcntl(pipe_w, _F_SETPIPE_SZ, _PIPE_SIZE)
+                    except OSError:
+                        pass
+                pipes[src.fileno()] = (pipe_r, pipe_w, dst)
+                sel.register(src, selectors.EVENT_READ)
+
+            open_directions = 2
+            while open_directions > 0:
+                events = sel.select(timeout=30)
+                if not events:
+                    break  # idle timeout, same budget the old thread join used
+                for key, _ in events:
+                    src = key.fileobj
+                    pipe_r, pipe_w, dst = pipes[src.fileno()]
+                    try:
+                        n = os.splice(src.fileno(), pipe_w, _PIPE_SIZE, flags=_SPLICE_FLAGS)
+                    except BlockingIOError:
+                        continue
+                    if n == 0:
+                        sel.unregister(src)
+                        open_directions -= 1
+                        _shutdown_write(dst)
+                        continue
+                    while n > 0:
+                        try:
+                            n -= os.splice(pipe_r, dst.fileno(), n, flags=_SPLICE_FLAGS)
+                        except BlockingIOError:
+                            select.select([], [dst], [], 30)
+        finally:
+            sel.close()
+            for pipe_r, pipe_w, _ in pipes.values():
+                try:
+                    os.close(pipe_r)
+                    os.close(pipe_w)
+                except OSError:
+                    pass
+            # The fds stay owned by the asyncio transports; relay_data
+            # closes the writers once this returns.
+
+    async def _relay_streams(self, tor_reader, tor_writer):
+        """Portable relay: one pipe coroutine per direction, no threads."""
+        async def pipe(reader, writer):
+            try:
+                while True:
+                    data = await reader.read(_RELAY_CHUNK)
+                    if not data:
+                        break
+                    writer.write(data)
+                    await writer.drain()
+            except Exception:
+                pass
+            finally:
+                try:
+                    writer.close()
+                except:
+                    pass
+
+        await asyncio.gather(
+            pipe(self.reader, tor_writer),
+            pipe(tor_reader, self.writer),
+        )
+
+    async def _open_greeted_stream(self, tor_port):
+        """Fresh connection to the Tor SOCKS port, greeting included."""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection('127.0.0.1', tor_port), timeout=5)
+        tor_sock = writer.get_extra_info('socket')
+        if tor_sock is not None:
+            _tune_socket(tor_sock)
+
+        writer.write(b'\x05\x01\x00')
+        await writer.drain()
+        resp = await asyncio.wait_for(reader.readexactly(2), timeout=5)
+        if not resp or resp[1] != 0x00:
+            writer.close()
+            return None
+        return reader, writer
+
+    @staticmethod
+    async def _socks_connect(reader, writer, req):
+        """Send the CONNECT request, return True on a 0x00 reply."""
+        writer.write(req)
+        await writer.drain()
+        resp = await asyncio.wait_for(reader.read(10), timeout=5)
+        return bool(resp) and resp[1] == 0x00
+
+    async def connect_to_tor(self, target_host, target_port):
+        """Tor SOCKS portuna baglanir - OPTİMİZE."""
+        tor_port = self.pool_manager.get_proxy_port()
+        if not tor_port:
+            return None
+
+        try:
+            # VER CMD RSV ATYP LEN host PORT, built in one pre-sized buffer
+            # instead of six struct.pack/concat temporaries.
+            host_bytes = target_host.encode()
+            req = bytearray(7 + len(host_bytes))
+            req[0:4] = b'\x05\x01\x00\x03'
+            req[4] = len(host_bytes)
+            req[5:5 + len(host_bytes)] = host_bytes
+            req[-2] = (target_port >> 8) & 0xFF
+            req[-1] = target_port & 0xFF
+            req = bytes(req)
+
+            pooled = self.pool_manager.acquire_socks_socket(tor_port)
+            if pooled is not None:
+                # Greeting already done at pool-fill time; only the
+                # per-target CONNECT round trip is left.
+                pooled.setblocking(False)
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(sock=pooled), timeout=5)
+                _tune_socket(pooled)
+                try:
+                    if await self._socks_connect(reader, writer, req):
+                        return reader, writer
+                except Exception:
+                    pass
+                # Tor reaps greeted-but-idle connections after
+                # SocksTimeout, so a pooled socket can be dead; fall
+                # through and retry once on a fresh connection instead
+                # of answering 502.
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+
+            fresh = await self._open_greeted_stream(tor_port)
+            if fresh is None:
+                return None
+            reader, writer = fresh
+
+            if not await self._socks_connect(reader, writer, req):
+                writer.close()
+                return None
+
+            return reader, writer
+        except Exception:
+            return None
+
+    async def handle_http(self, data):
+        # Slice out only the request line; splitting the whole buffer on
+        # b'\r\n' copied every header (and any piggybacked body) into a list.
+        eol = data.find(b'\r\n')
+        first_line = (data[:eol] if eol >= 0 else data).decode('utf-8', errors='ignore')
+
+        if "GET /rotate" in first_line:
+            try:
+                instance = self.pool_manager.get_current_instance()
+                if not instance:
+                    self.writer.write(_RESP_NO_INSTANCE)
+                    await self.writer.drain()
+                    return
+
+                # get_ip is a blocking SOCKS+TLS+HTTP round trip and can
+                # sit on the instance's lookup lock behind an IpCheckWorker;
+                # inline it would stall every connection on the loop.
+                loop = asyncio.get_running_loop()
+                old_ip = await loop.run_in_executor(
+                    None, lambda: instance.get_ip(max_retries=1, retry_delay=0))
+                if old_ip == "...":
+                    old_ip = "Hazırlanıyor"
+
+                pool_size = len(self.pool_manager.instances)
+
+                # NEWNYM round trip, also blocking.
+                new_instance = await loop.run_in_executor(
+                    None, self.pool_manager.switch_to_next_instance)
+
+                new_ip = await loop.run_in_executor(
+                    None, lambda: new_instance.get_ip(max_retries=1, retry_delay=0))
+                if new_ip == "...":
+                    new_ip = "Connecting..."
+
+                elapsed_time = 0.1
+                if pool_size == 1:
+                    response_body = f"IP Renewal Started\nOld IP: {old_ip}\nPort: {new_instance.socks_port}\nNew IP: {new_ip}\nTime: {elapsed_time:.1f}s"
+                else:
+                    response_body = f"IP Rotation Started\nOld IP: {old_ip}\nNew Port: {new_instance.socks_port}\nNew IP: {new_ip}\nTime: {elapsed_time:.1f}s"
+                body = response_body.encode()
+                self.writer.write(_RESP_OK_HEADER % len(body) + body)
+                await self.writer.drain()
+
+            except Exception as e:
+                self.writer.write(_RESP_ERROR_PREFIX + str(e).encode())
+                await self.writer.drain()
+            return
+
+        host = ""
+        port = 80
+
+        parts = first_line.split(' ')
+        if len(parts) < 2:
+            return
+
+        method = parts[0]
+        url = parts[1]
+
+        if method == 'CONNECT':
+            try:
+                host, port_str = url.split(':')
+                port = int(port_str)
+            except:
+                return
+
+            tor_conn = await self.connect_to_tor(host, port)
+            if tor_conn:
+                self.writer.write(_RESP_CONNECT_OK)
+                await self.writer.drain()
+                await self.relay_data(*tor_conn)
+            else:
+                self.writer.write(_RESP_BAD_GATEWAY)
+                await self.writer.drain()
+
+        else:
+            if 'http://' in url:
+                try:
+                    from urllib.parse import urlparse
+                    u = urlparse(url)
+                    host = u.hostname
+                    port = u.port or 80
+                except:
+                    pass
+
+            if not host:
+                m = _HOST_HEADER_RE.search(data)
+                if m:
+                    host = m.group(1).strip().decode()
+                    if ':' in host:
+                        host, port = host.split(':')
+                        port = int(port)
+
+            if host:
+                tor_conn = await self.connect_to_tor(host, port)
+                if tor_conn:
+                    tor_reader, tor_writer = tor_conn
+                    tor_writer.write(data)  # Istegi aynen ilet
+                    await tor_writer.drain()
+                    await self.relay_data(tor_reader, tor_writer)
+                else:
+                    self.writer.write(_RESP_BAD_GATEWAY)
+                    await self.writer.drain()
+
+    async def handle(self):
+        try:
+            data = await asyncio.wait_for(self.reader.read(_RELAY_CHUNK), timeout=self.timeout)
+            if not data:
+                return
+
+            protocol = self.detect_protocol(data[0])
+
+            if protocol == "HTTP":
+                await self.handle_http(data)
+
+            elif protocol == "SOCKS5":
+                pass
+
+        except (Exception, asyncio.CancelledError):
+            # CancelledError means the server is shutting down; the
+            # connection just closes below.
+            pass
+        finally:
+            try:
+                self.writer.close()
+            except:
+                pass
+
+
+class HybridProxyServer:
+    """Asyncio event-loop proxy server: one loop thread, zero threads per connection."""
+    allow_reuse_address = True
+
+    def __init__(self, pool_manager: TorPoolManager, host: str = '0.0.0.0', port: int = 8080, log_callback=None):
+        self.pool_manager = pool_manager
+        self.log_callback = log_callback
+        # Bind here so a port conflict still raises from the constructor.
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # SO_REUSEPORT lets additional processes bind the same port and
+        # share the accept load; not available on Windows.
+        if hasattr(socket, 'SO_REUSEPORT'):
+            try:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            except OSError:
+                pass
+        _tune_socket(self.socket, bufsize=_LISTEN_BUF)
+        self.socket.bind((host, port))
+        self.socket.listen(128)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Kernel relays park one thread per live tunnel for its whole
+        # lifetime; the loop's default executor caps at min(32, cpus+4),
+        # past which new tunnels would get their 200 and then silently
+        # move nothing. Dedicated pool sized for the tunnel count.
+        self.relay_executor = ThreadPoolExecutor(max_workers=128, thread_name_prefix='relay')
+        self.running = False
+
+    async def _handle_client(self, reader, writer):
+        await HybridProxyHandler(self, reader, writer).handle()
+
+    async def _serve(self):
+        self._server = await asyncio.start_server(self._handle_client, sock=self.socket)
+        async with self._server:
+            await self._server.serve_forever()
+
+    def serve_forever(self):
+        self.running = True
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        except:
+            pass
+        finally:
+            self.running = False
+            try:
+                # Let cancelled connection tasks unwind before the loop dies.
+                pending = asyncio.all_tasks(self._loop)
+                if pending:
+                    self._loop.run_until_complete(
+                        asyncio.gather(*pending, return_exceptions=True))
+            except:
+                pass
+            try:
+                self._loop.close()
+            except:
+                pass
+            self.relay_executor.shutdown(wait=False)
+
+    def _shutdown(self):
+        # Runs on the loop: close the listener and cancel every task
+        # (acceptor + live connection handlers) so run_until_complete
+        # returns instead of abandoning pending tasks.
+        try:
+            if self._server is not None:
+                self._server.close()
+        except (OSError, ValueError):
+            pass
+        for task in asyncio.all_tasks(self._loop):
+            task.cancel()
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+    def stop(self):
+        self.running = False
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                loop.call_soon_threadsafe(self._shutdown)
+                return
+            except RuntimeError:
+                pass
+        try:
+            self.socket.close()
+        except:
+            pass
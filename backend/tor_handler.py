@@ -1,34 +1,254 @@
 import os
 import sys
+import json
+import signal
+import ssl
 import subprocess
 import time
 import uuid
+import queue
 import shutil
+import asyncio
 import socket
 import threading
 from pathlib import Path
 from typing import Optional, List
 from concurrent.futures import ThreadPoolExecutor
 
-try:
-    import requests
-    from requests.adapters import HTTPAdapter
-    from urllib3.util.retry import Retry
-except ImportError:
-    pass
-
 try:
     from stem.control import Controller
 except ImportError:
     pass
 
 
+# Shared TLS context for the lookup helpers; building one per request
+# costs a full CA bundle load.
+_ssl_context = ssl.create_default_context()
+
+
+def _read_http_response(sock) -> Optional[dict]:
+    """Reads an HTTP/1.0 response to EOF and returns the JSON body."""
+    data = b''
+    while True:
+        chunk = sock.recv(8192)
+        if not chunk:
+            break
+        data += chunk
+    header, sep, body = data.partition(b'\r\n\r\n')
+    if not sep:
+        return None
+    status_line = header.split(b'\r\n', 1)[0]
+    if b' 200' not in status_line:
+        return None
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _read_keepalive_response(sock) -> Optional[dict]:
+    """Reads one Content-Length framed HTTP/1.1 response, leaving the
+    connection reusable. Returns the JSON body or None."""
+    buf = b''
+    while b'\r\n\r\n' not in buf:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return None
+        buf += chunk
+        if len(buf) > 65536:
+            return None
+    header, _, body = buf.partition(b'\r\n\r\n')
+    lines = header.split(b'\r\n')
+    if b' 200' not in lines[0]:
+        return None
+    length = None
+    for line in lines[1:]:
+        if line.lower().startswith(b'content-length:'):
+            try:
+                length = int(line.split(b':', 1)[1])
+            except ValueError:
+                return None
+            break
+    if length is None or length > 65536:
+        return None
+    while len(body) < length:
+        chunk = sock.recv(length - len(body))
+        if not chunk:
+            return None
+        body += chunk
+    try:
+        parsed = json.loads(body[:length])
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+# Process-wide resolver cache for the direct (non-Tor) lookups; the
+# country endpoint is a fixed host, so one DNS query per TTL is enough.
+_addr_cache: dict = {}
+_addr_cache_lock = threading.Lock()
+_ADDR_TTL = 300
+
+
+def _resolve_cached(host: str) -> str:
+    now = time.time()
+    with _addr_cache_lock:
+        hit = _addr_cache.get(host)
+        if hit and hit[1] > now:
+            return hit[0]
+    try:
+        addr = socket.gethostbyname(host)
+    except OSError:
+        return host
+    with _addr_cache_lock:
+        _addr_cache[host] = (addr, now + _ADDR_TTL)
+    return addr
+
+
+def _direct_http_get_json(host: str, path: str, timeout: float) -> Optional[dict]:
+    """Plain HTTP/1.0 GET without a proxy; replaces requests for tiny
+    JSON lookups so no session/adapter machinery is touched per call."""
+    try:
+        with socket.create_connection((_resolve_cached(host), 80), timeout=timeout) as s:
+            s.sendall(f"GET {path} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+            return _read_http_response(s)
+    except (OSError, ValueError):
+        return None
+
+
+# One background event loop shared by all prewarm/renew jobs. Rotations
+# used to spawn a fresh daemon thread each; the coroutines now sleep on
+# the loop and only borrow an executor thread for the blocking calls.
+_bg_loop: Optional[asyncio.AbstractEventLoop] = None
+_bg_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _bg_loop
+    with _bg_loop_lock:
+        if _bg_loop is None or _bg_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True, name="tor-prewarm-loop").start()
+            _bg_loop = loop
+        return _bg_loop
+
+
+def _run_in_background(coro):
+    try:
+        asyncio.run_coroutine_threadsafe(coro, _get_background_loop())
+    except RuntimeError:
+        coro.close()
+
+
+async def _prewarm_instance(instance: "TorInstance"):
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, instance.renew_ip)
+        for _ in range(5):
+            await asyncio.sleep(1)
+            if await loop.run_in_executor(None, instance.is_circuit_ready):
+                break
+        await loop.run_in_executor(None, lambda: instance.get_ip(max_retries=2, retry_delay=0))
+    except Exception:
+        pass
+
+
+# Process-wide IP -> country code cache. An exit IP's country never
+# changes, and rotation keeps cycling through the same exits, so each
+# ip-api.com lookup only ever needs to happen once.
+_country_cache: dict = {}
+_country_cache_lock = threading.Lock()
+
+
+# Precomputed hash of the default control password; hashing it per
+# instance would just burn CPU for the same constant string.
+HASHED_CONTROL_PASSWORD = "16:872860B76453A77D60CA2BB8C1A7042072093276A3D701AD9B00AC5DA7"
+
+
 def get_exe_dir() -> Path:
     if getattr(sys, 'frozen', False):
         return Path(sys.executable).parent
     else:
         return Path(__file__).parent.parent
 
+
+# Pid tracking for the Tor processes we spawn. Killing by pid instead of
+# `taskkill /IM tor.exe` leaves unrelated Tor processes (e.g. Tor Browser)
+# alone; the pidfile survives a crash so stale instances from a previous
+# run still get cleaned up.
+_PID_FILE = get_exe_dir() / "data" / "tor_pids.txt"
+_pid_lock = threading.Lock()
+
+
+def _read_tracked_pids():
+    try:
+        with open(_PID_FILE, 'r', encoding='utf-8') as f:
+            return [int(line) for line in f.read().split() if line.strip().isdigit()]
+    except (OSError, ValueError):
+        return []
+
+
+def _write_tracked_pids(pids):
+    try:
+        _PID_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(_PID_FILE, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(str(p) for p in pids))
+    except OSError:
+        pass
+
+
+def _track_pid(pid):
+    with _pid_lock:
+        pids = _read_tracked_pids()
+        if pid not in pids:
+            pids.append(pid)
+            _write_tracked_pids(pids)
+
+
+def _untrack_pid(pid):
+    with _pid_lock:
+        pids = _read_tracked_pids()
+        if pid in pids:
+            pids.remove(pid)
+            _write_tracked_pids(pids)
+
+
+def _is_tor_pid(pid):
+    """Pid dosyası reboot/crash sonrasında da okunur ve pid bu arada
+    başka bir sürece geri verilmiş olabilir; öldürmeden önce sürecin
+    hâlâ tor olduğunu doğrula."""
+    try:
+        with open(f"/proc/{pid}/comm", 'r', encoding='utf-8') as f:
+            return f.read().strip().lower().startswith("tor")
+    except OSError:
+        return False
+
+
+def _terminate_pid(pid):
+    try:
+        if sys.platform == "win32":
+            # /FI filtresi pid geri dağıtılmışsa taskkill'i no-op yapar;
+            # filtresiz hali alakasız bir süreci öldürebiliyordu.
+            subprocess.run(
+                ["taskkill", "/F", "/FI", "IMAGENAME eq tor.exe", "/PID", str(pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                creationflags=subprocess.CREATE_NO_WINDOW,
+            )
+        elif _is_tor_pid(pid):
+            os.kill(pid, signal.SIGTERM)
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+
+def _terminate_tracked_pids():
+    with _pid_lock:
+        pids = _read_tracked_pids()
+        for pid in pids:
+            _terminate_pid(pid)
+        _write_tracked_pids([])
+
 class TorInstance:
     
     def __init__(self, socks_port: int = 9050, control_port: int = 9051, password: str = None):
@@ -47,51 +267,50 @@ class TorInstance:
         self.process: Optional[subprocess.Popen] = None
         self.torrc_path = self.data_dir / "torrc"
         
-        try:
-            self.session = requests.Session()
-            
-            adapter = HTTPAdapter(
-                pool_connections=2,
-                pool_maxsize=2,
-                max_retries=Retry(total=0, backoff_factor=0)  
-            )
-            self.session.mount('http://', adapter)
-            self.session.mount('https://', adapter)
-            self.session.headers.update({'Connection': 'keep-alive'})
-            self.session.proxies = {
-                'http': f'socks5://127.0.0.1:{self.socks_port}',
-                'https': f'socks5://127.0.0.1:{self.socks_port}'
-            }
-        except:
-            self.session = None
-        
         self._ip_cache = None
         self._ip_cache_time = 0
-        self._cache_ttl = 60 
+        self._cache_ttl = 60
+
+        # Kalıcı control-port bağlantısı; her NEWNYM/durum sorgusu için
+        # yeniden bağlanıp authenticate olmak iki round-trip israfıydı.
+        self._controller = None
+        self._controller_lock = threading.Lock()
+
+        # IP sorguları için keep-alive TLS bağlantısı. Her kontrolde
+        # SOCKS handshake + TLS kurmak yerine aynı tünel tekrar kullanılır;
+        # NEWNYM sonrası düşürülür ki eski devreye yapışıp kalmasın.
+        self._lookup_conn = None
+        self._lookup_conn_host = None
+        self._lookup_lock = threading.Lock()
+
+        # Bootstrap tamamlanınca set edilir; bekleyen worker'lar sleep
+        # döngüsü yerine OS seviyesinde bu event üzerinde bloklanır.
+        self.circuit_ready_event = threading.Event()
         
         if sys.platform == "win32":
             self.creation_flags = subprocess.CREATE_NO_WINDOW
         else:
             self.creation_flags = 0
 
+    # Tek scandir turunda eşleşecek isimler; eski hali 5 ayrı glob
+    # geçişiyle aynı dizini tekrar tekrar okuyordu.
+    _STATE_NAMES = frozenset(("state", "lock"))
+    _STATE_PREFIXES = ("cached-", "router", "micro")
+
     def _reset_cached_state(self):
         """Klasörü tamamen silmeden Tor state/cache dosyalarını temizler."""
         try:
             if self.data_dir.exists():
-                patterns = [
-                    "cached-*",
-                    "state",
-                    "lock",
-                    "router*",
-                    "micro*",
-                ]
-                for pattern in patterns:
-                    for path in self.data_dir.glob(pattern):
+                with os.scandir(self.data_dir) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if name not in self._STATE_NAMES and not name.startswith(self._STATE_PREFIXES):
+                            continue
                         try:
-                            if path.is_file():
-                                path.unlink()
-                            elif path.is_dir():
-                                shutil.rmtree(path, ignore_errors=True)
+                            if entry.is_file():
+                                os.unlink(entry.path)
+                            elif entry.is_dir():
+                                shutil.rmtree(entry.path, ignore_errors=True)
                         except Exception:
                             pass
             else:
@@ -100,7 +319,7 @@ class TorInstance:
             pass
     
     def _create_hashed_password(self) -> str:
-        return "16:872860B76453A77D60CA2BB8C1A7042072093276A3D701AD9B00AC5DA7"
+        return HASHED_CONTROL_PASSWORD
 
     def _create_data_directory(self):
         try:
@@ -141,21 +360,15 @@ HashedControlPassword {hashed}
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
                 creationflags=self.creation_flags,
-                cwd=str(self.project_root)  
+                cwd=str(self.project_root)
             )
-            ready = False
-            for _ in range(180):
-                time.sleep(1.0)
-                try:
-                    if self.is_circuit_ready_socks(timeout_sec=5.0):
-                        ready = True
-                        break
-                except Exception:
-                    pass
+            _track_pid(self.process.pid)
+            ready = self._wait_for_bootstrap(timeout=180.0)
             if not ready:
                 self.stop()
                 return False
             self._ip_cache = None
+            self.circuit_ready_event.set()
             return True
             
         except Exception:
@@ -163,7 +376,11 @@ HashedControlPassword {hashed}
             return False
 
     def stop(self):
+        self.circuit_ready_event.clear()
+        self._drop_controller()
+        self._drop_lookup_conn()
         if self.process:
+            pid = self.process.pid
             try:
                 self.process.terminate()
                 try:
@@ -176,132 +393,319 @@ HashedControlPassword {hashed}
             except Exception:
                 pass
             self.process = None
+            _untrack_pid(pid)
     
-    def renew_ip(self):
+    def _wait_for_bootstrap(self, timeout: float = 180.0) -> bool:
+        """Tor'un bootstrap'ını control port üzerinden bekler.
+
+        status/bootstrap-phase sorgusu saniyede bir TLS probe atmaktan çok
+        daha ucuz; stem yoksa eski SOCKS-probe döngüsüne düşer. PROGRESS=100
+        sonrası tek bir SOCKS doğrulaması yapılır.
+        """
+        deadline = time.time() + timeout
+        controller = None
+        bootstrapped = False
         try:
-            with Controller.from_port(port=self.control_port, timeout=2) as controller:
+            while time.time() < deadline:
+                if self.process is not None and self.process.poll() is not None:
+                    return False  # tor süreci öldü, beklemenin anlamı yok
+                if controller is None:
+                    try:
+                        controller = Controller.from_port(port=self.control_port, timeout=2)
+                        controller.authenticate(password=self.password)
+                    except NameError:
+                        break  # stem yok, aşağıdaki SOCKS döngüsü devralır
+                    except Exception:
+                        controller = None
+                        time.sleep(0.5)
+                        continue
+                try:
+                    phase = controller.get_info("status/bootstrap-phase")
+                    if "PROGRESS=100" in str(phase):
+                        bootstrapped = True
+                        break
+                except Exception:
+                    try:
+                        controller.close()
+                    except Exception:
+                        pass
+                    controller = None
+                time.sleep(0.25)
+        finally:
+            if controller is not None:
+                try:
+                    controller.close()
+                except Exception:
+                    pass
+
+        # Bootstrap bitti (veya stem yok): SOCKS seviyesinde doğrula.
+        probe_interval = 1.0 if not bootstrapped else 0.0
+        while time.time() < deadline:
+            try:
+                if self.is_circuit_ready_socks(timeout_sec=5.0):
+                    return True
+            except Exception:
+                pass
+            time.sleep(probe_interval or 0.5)
+        return False
+
+    def _get_controller(self):
+        with self._controller_lock:
+            if self._controller is None:
+                controller = Controller.from_port(port=self.control_port, timeout=2)
                 controller.authenticate(password=self.password)
-                controller.signal("NEWNYM")
-                self._ip_cache = None
+                self._controller = controller
+            return self._controller
+
+    def _drop_controller(self):
+        with self._controller_lock:
+            if self._controller is not None:
+                try:
+                    self._controller.close()
+                except Exception:
+                    pass
+                self._controller = None
+
+    def renew_ip(self):
+        try:
+            self._get_controller().signal("NEWNYM")
+            self._ip_cache = None
+            # Açık lookup tüneli eski devrede kalır; kapat ki sonraki
+            # IP sorgusu yeni devreden geçsin.
+            self._drop_lookup_conn()
         except:
-            pass
+            # Bağlantı kopmuş olabilir; düşür, sonraki çağrı yeniden kurar.
+            self._drop_controller()
+
+    def _open_lookup_tls(self, host: str, timeout: float):
+        """SOCKS5 greeting + CONNECT by hand, tunnel wrapped in TLS."""
+        try:
+            s = socket.create_connection(('127.0.0.1', self.socks_port), timeout=timeout)
+        except OSError:
+            return None
+        try:
+            s.sendall(b'\x05\x01\x00')
+            if s.recv(2) != b'\x05\x00':
+                s.close()
+                return None
+            host_bytes = host.encode()
+            req = bytearray(7 + len(host_bytes))
+            req[0:4] = b'\x05\x01\x00\x03'
+            req[4] = len(host_bytes)
+            req[5:5 + len(host_bytes)] = host_bytes
+            req[-2:] = (443).to_bytes(2, 'big')
+            s.sendall(bytes(req))
+            resp = s.recv(10)
+            if len(resp) < 2 or resp[1] != 0x00:
+                s.close()
+                return None
+            return _ssl_context.wrap_socket(s, server_hostname=host)
+        except (OSError, ValueError):
+            try:
+                s.close()
+            except OSError:
+                pass
+            return None
+
+    def _drop_lookup_conn(self):
+        with self._lookup_lock:
+            if self._lookup_conn is not None:
+                try:
+                    self._lookup_conn.close()
+                except OSError:
+                    pass
+                self._lookup_conn = None
+                self._lookup_conn_host = None
+
+    def _socks_https_get_json(self, host: str, path: str, timeout: float) -> Optional[dict]:
+        """HTTPS GET through this instance's SOCKS port with raw sockets.
+
+        The TLS tunnel is kept open between calls and reused with HTTP/1.1
+        keep-alive, so repeated IP checks cost one request round trip
+        instead of SOCKS handshake + CONNECT + TLS setup each time.
+        """
+        request = (f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+                   f"Connection: keep-alive\r\n\r\n").encode()
+        with self._lookup_lock:
+            for attempt in range(2):
+                s = self._lookup_conn if self._lookup_conn_host == host else None
+                self._lookup_conn = None
+                if s is None:
+                    if attempt == 0:
+                        continue  # ilk tur cache'i dener, ikincisi taze kurar
+                    s = self._open_lookup_tls(host, timeout)
+                    if s is None:
+                        return None
+                try:
+                    s.settimeout(timeout)
+                    s.sendall(request)
+                    data = _read_keepalive_response(s)
+                    if data is not None:
+                        self._lookup_conn = s
+                        self._lookup_conn_host = host
+                        return data
+                except (OSError, ValueError):
+                    pass
+                try:
+                    s.close()
+                except OSError:
+                    pass
+        return None
+
+    def has_fresh_ip(self) -> bool:
+        """Cache'teki IP hâlâ TTL içinde mi? (get_ip çağrısı ağa çıkmaz)"""
+        return bool(self._ip_cache) and (time.time() - self._ip_cache_time) < self._cache_ttl
 
     def get_ip(self, max_retries=1, retry_delay=0):
-        current_time = time.time()
-        if self._ip_cache and (current_time - self._ip_cache_time) < self._cache_ttl:
+        if self.has_fresh_ip():
             return self._ip_cache
-        
+
         for attempt in range(max_retries):
-            try:
-                if self.session:
-                    response = self.session.get(
-                        "https://api.ipify.org?format=json", 
-                        timeout=3.0,
-                        allow_redirects=False 
-                    )
-                else:
-                    proxies = {
-                        'http': f'socks5://127.0.0.1:{self.socks_port}',
-                        'https': f'socks5://127.0.0.1:{self.socks_port}'
-                    }
-                    response = requests.get(
-                        "https://api.ipify.org?format=json", 
-                        proxies=proxies, 
-                        timeout=3.0,
-                        allow_redirects=False
-                    )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if isinstance(data, dict):
-                        ip = data.get('ip', '')
-                        if ip and isinstance(ip, str):
-                            ip = ip.strip()
-                            self._ip_cache = ip
-                            self._ip_cache_time = time.time()
-                            return ip
-            except Exception:
-                pass
-            
+            data = self._socks_https_get_json("api.ipify.org", "/?format=json", 3.0)
+            if data:
+                ip = data.get('ip', '')
+                if ip and isinstance(ip, str):
+                    ip = ip.strip()
+                    self._ip_cache = ip
+                    self._ip_cache_time = time.time()
+                    return ip
+
             if retry_delay > 0 and attempt < max_retries - 1:
                 time.sleep(retry_delay)
-        
+
         return "..."
 
     def get_country(self, ip=None):
         if not ip or ip in ("Bilinmiyor", "Hazır", "Yükleniyor...", "...", "-"):
             return "-"
-        try:
-            if self.session:
-                old_proxies = self.session.proxies
-                self.session.proxies = {}
-                try:
-                    response = self.session.get(
-                        f"http://ip-api.com/json/{ip}", 
-                        timeout=2.0,
-                        allow_redirects=False
-                    )
-                finally:
-                    self.session.proxies = old_proxies
-            else:
-                response = requests.get(
-                    f"http://ip-api.com/json/{ip}", 
-                    timeout=2.0,
-                    allow_redirects=False
-                )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, dict):
-                    country_code = data.get("countryCode", "-")
-                    if country_code and isinstance(country_code, str):
-                        return country_code.strip()
-                return "-"
-        except Exception:
-            pass
+        with _country_cache_lock:
+            cached = _country_cache.get(ip)
+        if cached is not None:
+            return cached
+        data = _direct_http_get_json("ip-api.com", f"/json/{ip}", 2.0)
+        if data:
+            country_code = data.get("countryCode", "-")
+            if country_code and isinstance(country_code, str):
+                country_code = country_code.strip()
+                with _country_cache_lock:
+                    _country_cache[ip] = country_code
+                return country_code
         return "-"
 
     def is_circuit_ready_socks(self, timeout_sec: float = 5.0) -> bool:
-        try:
-            proxies = {
-                'http': f'socks5://127.0.0.1:{self.socks_port}',
-                'https': f'socks5://127.0.0.1:{self.socks_port}'
-            }
-            r = requests.get("https://api.ipify.org?format=json", proxies=proxies, timeout=timeout_sec)
-            if r.status_code == 200:
-                d = r.json()
-                return isinstance(d, dict) and isinstance(d.get('ip'), str) and len(d.get('ip', '')) > 0
-        except Exception:
-            pass
-        return False
+        data = self._socks_https_get_json("api.ipify.org", "/?format=json", timeout_sec)
+        return bool(data) and isinstance(data.get('ip'), str) and len(data.get('ip', '')) > 0
 
     def is_circuit_ready(self):
         try:
-            with Controller.from_port(port=self.control_port, timeout=2) as controller:
-                controller.authenticate(password=self.password)
-                status = controller.get_info("status/circuit-established")
-                return "1" in str(status)
+            status = self._get_controller().get_info("status/circuit-established")
+            ready = "1" in str(status)
+            if ready:
+                # Event'i buradan da besle: bekleyenler poll turunu
+                # beklemeden uyanır.
+                self.circuit_ready_event.set()
+            return ready
         except:
+            self._drop_controller()
             return False
 
 
 class TorPoolManager:
-    
+
+    # Idle pre-greeted SOCKS5 connections kept per Tor port. The greeting
+    # costs one round trip, so handing out a greeted socket saves it on
+    # every proxied request.
+    SOCKS_POOL_SIZE = 8
+    # Refill kicks in only below this; topping up on every hit spawned a
+    # thread per proxied request.
+    SOCKS_POOL_LOW_WATER = SOCKS_POOL_SIZE // 2
+
     def __init__(self, count: int = 1, base_socks_port: int = 9050, base_control_port: int = 9051):
         self.count = count
         self.base_socks_port = base_socks_port
         self.base_control_port = base_control_port
         self.instances: List[TorInstance] = []
         self.current_index = 0
+        # Tor port -> LifoQueue of sockets past the \x05\x01\x00 greeting.
+        # LifoQueue is lock-free enough here: no extra mutex, warmest
+        # socket is reused first.
+        self._socks_conn_pool: dict = {}
+        # Ports with a refill thread already running; at most one per port.
+        self._refilling = set()
+        self._refill_lock = threading.Lock()
+
+    def _make_greeted_socket(self, tor_port: int):
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.settimeout(5)
+            s.connect(('127.0.0.1', tor_port))
+            s.sendall(b'\x05\x01\x00')
+            resp = s.recv(2)
+            if resp != b'\x05\x00':
+                s.close()
+                return None
+            return s
+        except Exception:
+            return None
+
+    def _refill_socks_pool(self, tor_port: int):
+        q = self._socks_conn_pool.setdefault(tor_port, queue.LifoQueue(maxsize=self.SOCKS_POOL_SIZE))
+        while q.qsize() < self.SOCKS_POOL_SIZE:
+            s = self._make_greeted_socket(tor_port)
+            if s is None:
+                break
+            try:
+                q.put_nowait(s)
+            except queue.Full:
+                s.close()
+                break
+
+    def _refill_socks_pool_bg(self, tor_port: int):
+        try:
+            self._refill_socks_pool(tor_port)
+        finally:
+            with self._refill_lock:
+                self._refilling.discard(tor_port)
+
+    def acquire_socks_socket(self, tor_port: int):
+        """Pop a pre-greeted socket for the port, or None if the pool is dry.
+
+        The pool is only topped up once it drops below the low-water
+        mark, and never by more than one refill thread per port; the old
+        refill-on-every-hit reintroduced a thread per proxied request.
+        """
+        q = self._socks_conn_pool.get(tor_port)
+        if q is None:
+            return None
+        try:
+            s = q.get_nowait()
+        except queue.Empty:
+            s = None
+        if s is None or q.qsize() < self.SOCKS_POOL_LOW_WATER:
+            with self._refill_lock:
+                start_refill = tor_port not in self._refilling
+                if start_refill:
+                    self._refilling.add(tor_port)
+            if start_refill:
+                threading.Thread(target=self._refill_socks_pool_bg, args=(tor_port,), daemon=True).start()
+        return s
+
+    def _close_socks_pool(self):
+        for q in self._socks_conn_pool.values():
+            while True:
+                try:
+                    q.get_nowait().close()
+                except (queue.Empty, OSError):
+                    break
+        self._socks_conn_pool.clear()
     
     def start_pool(self):
         try:
-            os.system("taskkill /F /IM tor.exe >nul 2>&1")
+            _terminate_tracked_pids()
             time.sleep(0.5)
         except Exception:
             pass
 
-
         launched_instances = []
         futures = []
         with ThreadPoolExecutor(max_workers=min(self.count, 15)) as executor:
@@ -318,27 +722,39 @@ class TorPoolManager:
                 except Exception:
                     pass
         
-        max_wait = 30  
-        start_time = time.time()
-        while (time.time() - start_time) < max_wait:
-            try:
-                all_ready = all(inst.is_circuit_ready() for inst in self.instances)
-                if all_ready:
-                    break
-            except:
-                pass
-            time.sleep(0.5)
+        # Her turda tüm instance'lar paralel sorgulanır; hazır olanlar
+        # bekleme kümesinden düşer. Seri is_circuit_ready zinciri pool
+        # büyüdükçe 2s timeout x N'e kadar uzuyordu.
+        max_wait = 30
+        deadline = time.time() + max_wait
+        pending = set(self.instances)
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(len(pending), 15)) as executor:
+                while pending and time.time() < deadline:
+                    futures = {executor.submit(inst.is_circuit_ready): inst for inst in pending}
+                    for fut, inst in futures.items():
+                        try:
+                            if fut.result():
+                                pending.discard(inst)
+                        except Exception:
+                            pass
+                    if pending:
+                        time.sleep(0.5)
 
         if not self.instances:
             raise RuntimeError("Tor instanceları başlatılamadı (tor.exe veya data izinlerini kontrol et)")
 
+        for instance in self.instances:
+            self._refill_socks_pool(instance.socks_port)
+
     def stop_pool(self):
+        self._close_socks_pool()
         for instance in self.instances:
             instance.stop()
         self.instances.clear()
 
         try:
-            os.system("taskkill /F /IM tor.exe >nul 2>&1")
+            _terminate_tracked_pids()
         except Exception:
             pass
 
@@ -359,43 +775,15 @@ class TorPoolManager:
         
         if len(self.instances) == 1:
             current_instance = self.instances[0]
-            
-            def renew_single_ip():
-                try:
-                    current_instance.renew_ip()
-                    
-                    for attempt in range(5):
-                        time.sleep(1)
-                        if current_instance.is_circuit_ready():
-                            break
-                    
-                    current_instance.get_ip(max_retries=2, retry_delay=0)
-                except:
-                    pass
-            
-            threading.Thread(target=renew_single_ip, daemon=True).start()
+            _run_in_background(_prewarm_instance(current_instance))
             return current_instance
-        
+
         self.current_index = (self.current_index + 1) % len(self.instances)
         new_instance = self.instances[self.current_index]
-        
+
         old_index = (self.current_index - 1) % len(self.instances)
         old_instance = self.instances[old_index]
-        
-        def prewarm_old_instance():
-            try:
-                old_instance.renew_ip()
-                
-                for attempt in range(5):
-                    time.sleep(1)
-                    if old_instance.is_circuit_ready():
-                        break
-                
-                old_instance.get_ip(max_retries=2, retry_delay=0)
-                
-            except:
-                pass
-        
-        threading.Thread(target=prewarm_old_instance, daemon=True).start()
-        
+
+        _run_in_background(_prewarm_instance(old_instance))
+
         return new_instance
\ No newline at end of file
@@ -1,827 +1,949 @@
-import sys
-import json
-import time
-import socket
-import threading
-from datetime import datetime
-from pathlib import Path
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QSpinBox, QLineEdit, QTableWidget, QTableWidgetItem,
-    QTextEdit, QGroupBox, QMessageBox
-)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QRunnable, QObject, QThreadPool
-from PyQt5.QtGui import QFont, QColor
-
-from backend.tor_handler import TorPoolManager
-from backend.proxy_server import HybridProxyServer
-
-
-DEFAULT_CONFIG = {
-    "pool_size": 5,
-    "proxy_port": 8080,
-    "auto_rotate_time": 0,
-    "base_socks_port": 9050,
-    "base_control_port": 9051,
-    "ip_cache_ttl": 60,
-    "connection_timeout": 2.0,
-    "rotation_timeout": 10,
-    "check_interval": 1500
-}
-
-DARK_STYLE = """
-QMainWindow {
-    background-color: #1e1e1e;
-    color: #ffffff;
-}
-
-QWidget {
-    background-color: #1e1e1e;
-    color: #ffffff;
-}
-
-QGroupBox {
-    border: 2px solid #3a3a3a;
-    border-radius: 5px;
-    margin-top: 10px;
-    padding-top: 10px;
-    font-weight: bold;
-    color: #00ff00;
-}
-
-QGroupBox::title {
-    subcontrol-origin: margin;
-    left: 10px;
-    padding: 0 5px;
-}
-
-QPushButton {
-    background-color: #2d2d2d;
-    border: 2px solid #3a3a3a;
-    border-radius: 5px;
-    padding: 8px;
-    font-weight: bold;
-    min-height: 30px;
-}
-
-QPushButton:hover {
-    background-color: #3a3a3a;
-    border: 2px solid #4a4a4a;
-}
-
-QPushButton:pressed {
-    background-color: #1a1a1a;
-}
-
-QPushButton#startButton {
-    background-color: #00aa00;
-    border: 2px solid #00ff00;
-    color: #ffffff;
-    font-size: 14px;
-    min-height: 40px;
-}
-
-QPushButton#startButton:hover {
-    background-color: #00cc00;
-}
-
-QPushButton#stopButton {
-    background-color: #aa0000;
-    border: 2px solid #ff0000;
-    color: #ffffff;
-    font-size: 14px;
-    min-height: 40px;
-}
-
-QPushButton#stopButton:hover {
-    background-color: #cc0000;
-}
-
-QPushButton#rotateButton {
-    background-color: #aa5500;
-    border: 2px solid #ff8800;
-    color: #ffffff;
-    font-size: 12px;
-}
-
-QPushButton#rotateButton:hover {
-    background-color: #cc6600;
-}
-
-QSpinBox, QLineEdit {
-    background-color: #2d2d2d;
-    border: 2px solid #3a3a3a;
-    border-radius: 3px;
-    padding: 5px;
-    color: #ffffff;
-}
-
-QSpinBox:hover, QLineEdit:hover {
-    border: 2px solid #4a4a4a;
-}
-
-QSpinBox:focus, QLineEdit:focus {
-    border: 2px solid #00ff00;
-}
-
-QTableWidget {
-    background-color: #1a1a1a;
-    border: 2px solid #3a3a3a;
-    border-radius: 5px;
-    gridline-color: #3a3a3a;
-    color: #ffffff;
-    selection-background-color: #3a3a3a;
-    alternate-background-color: #2d2d2d;
-}
-
-QTableWidget::item {
-    padding: 5px;
-}
-
-QTableWidget::item:selected {
-    background-color: #00aa00;
-}
-
-QHeaderView::section {
-    background-color: #2d2d2d;
-    color: #00ff00;
-    padding: 5px;
-    border: 1px solid #3a3a3a;
-    font-weight: bold;
-}
-
-QTextEdit {
-    background-color: #000000;
-    border: 2px solid #3a3a3a;
-    border-radius: 5px;
-    color: #00ff00;
-    font-family: 'Consolas', 'Courier New', monospace;
-    font-size: 10pt;
-}
-
-QLabel {
-    color: #ffffff;
-}
-
-QLabel#statusLabel {
-    font-weight: bold;
-    font-size: 12pt;
-    padding: 10px;
-    border-radius: 5px;
-    background-color: #2d2d2d;
-}
-
-QLabel#infoLabel {
-    background-color: #2d2d2d;
-    border: 1px solid #3a3a3a;
-    border-radius: 3px;
-    padding: 8px;
-    color: #00ff00;
-}
-"""
-
-
-class ConfigManager:
-    def __init__(self, config_path: str = "config.json"):
-        self.config_path = Path(config_path)
-        self.default_config = DEFAULT_CONFIG.copy()
-    
-    def load(self) -> dict:
-        if self.config_path.exists():
-            try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    return {**self.default_config, **config}
-            except Exception:
-                return self.default_config.copy()
-        return self.default_config.copy()
-    
-    def save(self, config: dict):
-        try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4)
-        except Exception as e:
-            print(f"Config save error: {e}")
-
-
-class BackendWorker(QThread):
-    log_signal = pyqtSignal(str)
-    pool_ready_signal = pyqtSignal(object)
-    error_signal = pyqtSignal(str)
-    
-    def __init__(self, pool_size: int, proxy_port: int, base_socks_port: int, base_control_port: int):
-        super().__init__()
-        self.pool_size = pool_size
-        self.proxy_port = proxy_port
-        self.base_socks_port = base_socks_port
-        self.base_control_port = base_control_port
-        self.pool_manager = None
-        self.proxy_server = None
-        self.running = False
-    
-    def run(self):
-        try:
-            self.running = True
-            self.pool_manager = TorPoolManager(
-                count=self.pool_size,
-                base_socks_port=self.base_socks_port,
-                base_control_port=self.base_control_port
-            )
-            
-            try:
-                self.pool_manager.start_pool()
-            except Exception as e:
-                error_msg = f'<span style="color: #ff0000;">[{datetime.now().strftime("%H:%M:%S")}] ✗ Pool start error: {str(e)}</span>'
-                self.log_signal.emit(error_msg)
-                self.error_signal.emit(str(e))
-                return
-            
-            if not self.pool_manager.instances:
-                error_msg = f'<span style="color: #ff0000;">[{datetime.now().strftime("%H:%M:%S")}] ✗ Tor instances could not be started</span>'
-                self.log_signal.emit(error_msg)
-                self.error_signal.emit("No Tor instances started")
-                return
-            
-            self.log_signal.emit(f'<span style="color: #00ff00;">[{datetime.now().strftime("%H:%M:%S")}] [Pool ready - {len(self.pool_manager.instances)} instances]</span>')
-            
-            try:
-                self.proxy_server = HybridProxyServer(
-                    pool_manager=self.pool_manager,
-                    host='127.0.0.1',
-                    port=self.proxy_port,
-                    log_callback=self.log_signal.emit
-                )
-                self.log_signal.emit(f'<span style="color: #00ff00;">[{datetime.now().strftime("%H:%M:%S")}] [Proxy server started - 127.0.0.1:{self.proxy_port}]</span>')
-            except Exception as e:
-                error_msg = f'<span style="color: #ff0000;">[{datetime.now().strftime("%H:%M:%S")}] ✗ Proxy server start error: {str(e)}</span>'
-                self.log_signal.emit(error_msg)
-                self.error_signal.emit(f"Proxy server error: {str(e)}")
-                return
-            
-            self.pool_ready_signal.emit(self.pool_manager)
-            
-            self.proxy_server.timeout = 0.5
-            self.proxy_server.socket.settimeout(0.5)
-            while self.running:
-                try:
-                    self.proxy_server.handle_request()
-                except socket.timeout:
-                    continue
-                except Exception:
-                    if not self.running:
-                        break
-                    time.sleep(0.1)
-        except Exception as e:
-            if self.running:
-                error_msg = f'<span style="color: #ff0000;">[{datetime.now().strftime("%H:%M:%S")}] ✗ ERROR: {str(e)}</span>'
-                self.log_signal.emit(error_msg)
-                self.error_signal.emit(str(e))
-    
-    def stop(self):
-        self.running = False
-        if self.proxy_server:
-            try:
-                self.proxy_server.stop()
-            except:
-                pass
-        if self.pool_manager:
-            try:
-                self.pool_manager.stop_pool()
-            except:
-                pass
-    
-
-
-class WorkerSignals(QObject):
-    """Signals for IP check workers."""
-    result = pyqtSignal(int, str, str, str)  # row, ip, country, status
-
-
-class IpCheckWorker(QRunnable):
-    """High-performance QRunnable for checking a single Tor instance IP."""
-    
-    def __init__(self, row: int, instance, signals: WorkerSignals):
-        super().__init__()
-        self.row = row
-        self.instance = instance
-        self.signals = signals
-    
-    def _is_valid_ip(self, ip_str):
-        """Basic IP validation."""
-        if not ip_str or ip_str in ("Unknown", "Loading...", "Ready", "...", "-", "Preparing"):
-            return False
-        parts = ip_str.split('.')
-        if len(parts) != 4:
-            return False
-        try:
-            for part in parts:
-                num = int(part)
-                if num < 0 or num > 255:
-                    return False
-            return True
-        except ValueError:
-            return False
-    
-    def run(self):
-        """Execute IP check with caching and parallelization."""
-        try:
-            for _ in range(10):
-                if self.instance.is_circuit_ready():
-                    break
-                time.sleep(0.5)
-
-            ip = self.instance.get_ip(max_retries=3, retry_delay=1)
-
-            if ip and self._is_valid_ip(ip):
-                country = self.instance.get_country(ip)
-                status = "🟢 Ready"
-            elif ip == "...":
-                ip = "Loading..."
-                country = "Loading..."
-                status = "🟡 Connecting"
-            else:
-                ip = "Loading..."
-                country = "Loading..."
-                status = "🟡 Connecting"
-
-            try:
-                self.signals.result.emit(self.row, ip, country, status)
-            except RuntimeError:
-                pass
-        except Exception:
-            try:
-                self.signals.result.emit(self.row, "...", "-", "🔴 Error")
-            except RuntimeError:
-                pass
-
-
-class MainWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.config_manager = ConfigManager()
-        self.config = self.config_manager.load()
-        
-        self.backend_worker = None
-        self.pool_manager = None
-        self.system_running = False
-        self.ips_ready_signal_handled = False
-        self.rotation_timer = QTimer()
-        self.rotation_timer.timeout.connect(self.auto_rotate_ip)
-        self.ip_check_timer = QTimer()
-        self.ip_check_timer.timeout.connect(self.check_all_ips)
-        self.thread_pool = QThreadPool.globalInstance()
-        self.thread_pool.setMaxThreadCount(15)
-        self.last_ips = {}
-        self.worker_signals = {}
-        
-        self.init_ui()
-        self.apply_dark_theme()
-        self.load_config_to_ui()
-    
-    def init_ui(self):
-        self.setWindowTitle("MK Proxy Generator and Rotator")
-        self.setGeometry(100, 100, 1400, 800)
-        
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        
-        main_layout = QHBoxLayout()
-        central_widget.setLayout(main_layout)
-        
-        left_panel = self.create_left_panel()
-        right_panel = self.create_right_panel()
-        
-        main_layout.addWidget(left_panel, 1)
-        main_layout.addWidget(right_panel, 2)
-    
-    def create_left_panel(self):
-        panel = QWidget()
-        layout = QVBoxLayout()
-        panel.setLayout(layout)
-        
-        title = QLabel("Proxy Configuration")
-        title_font = QFont()
-        title_font.setPointSize(14)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setAlignment(Qt.AlignCenter)
-        layout.addWidget(title)
-        
-        config_group = QGroupBox("Settings")
-        config_layout = QVBoxLayout()
-        
-        pool_size_layout = QHBoxLayout()
-        pool_size_layout.addWidget(QLabel("Pool Size:"))
-        self.pool_size_spin = QSpinBox()
-        self.pool_size_spin.setRange(1, 10)
-        self.pool_size_spin.setValue(self.config.get("pool_size", 5))
-        self.pool_size_spin.setEnabled(not self.system_running)
-        pool_size_layout.addWidget(self.pool_size_spin)
-        config_layout.addLayout(pool_size_layout)
-        
-        proxy_port_layout = QHBoxLayout()
-        proxy_port_layout.addWidget(QLabel("Proxy Port:"))
-        self.proxy_port_input = QLineEdit()
-        self.proxy_port_input.setText(str(self.config.get("proxy_port", 8080)))
-        self.proxy_port_input.setEnabled(not self.system_running)
-        proxy_port_layout.addWidget(self.proxy_port_input)
-        config_layout.addLayout(proxy_port_layout)
-        
-        rotation_layout = QHBoxLayout()
-        rotation_layout.addWidget(QLabel("Auto Rotate Time (sec):"))
-        self.rotation_spin = QSpinBox()
-        self.rotation_spin.setRange(0, 3600)
-        self.rotation_spin.setValue(self.config.get("auto_rotate_time", 0))
-        self.rotation_spin.setSpecialValueText("Off/Manual")
-        self.rotation_spin.setEnabled(not self.system_running)
-        self.rotation_spin.valueChanged.connect(self.on_rotation_time_changed)
-        rotation_layout.addWidget(self.rotation_spin)
-        config_layout.addLayout(rotation_layout)
-        
-        config_group.setLayout(config_layout)
-        layout.addWidget(config_group)
-        
-        button_group = QGroupBox("Control")
-        button_layout = QVBoxLayout()
-        
-        self.start_button = QPushButton("Start")
-        self.start_button.setObjectName("startButton")
-        self.start_button.clicked.connect(self.start_system)
-        button_layout.addWidget(self.start_button)
-        
-        self.stop_button = QPushButton("Stop")
-        self.stop_button.setObjectName("stopButton")
-        self.stop_button.clicked.connect(self.stop_system)
-        self.stop_button.setEnabled(False)
-        button_layout.addWidget(self.stop_button)
-        
-        self.rotate_button = QPushButton("Change IP (Manual)")
-        self.rotate_button.setObjectName("rotateButton")
-        self.rotate_button.clicked.connect(self.manual_rotate_ip)
-        self.rotate_button.setEnabled(False)
-        button_layout.addWidget(self.rotate_button)
-        
-        button_group.setLayout(button_layout)
-        layout.addWidget(button_group)
-        
-        info_group = QGroupBox("Connection Info")
-        info_layout = QVBoxLayout()
-        
-        self.info_label = QLabel("Proxy Address: 127.0.0.1:8080")
-        self.info_label.setObjectName("infoLabel")
-        self.info_label.setWordWrap(True)
-        info_layout.addWidget(self.info_label)
-        
-        info_group.setLayout(info_layout)
-        layout.addWidget(info_group)
-        
-        status_group = QGroupBox("Status")
-        status_layout = QVBoxLayout()
-        
-        self.status_label = QLabel("System Status: IDLE")
-        self.status_label.setObjectName("statusLabel")
-        self.status_label.setStyleSheet("background-color: #aa0000; color: #ffffff;")
-        self.status_label.setAlignment(Qt.AlignCenter)
-        status_layout.addWidget(self.status_label)
-        
-        status_group.setLayout(status_layout)
-        layout.addWidget(status_group)
-        
-        layout.addStretch()
-        
-        return panel
-    
-    def create_right_panel(self):
-        panel = QWidget()
-        layout = QVBoxLayout()
-        panel.setLayout(layout)
-        
-        table_label = QLabel("Instance List")
-        table_label_font = QFont()
-        table_label_font.setPointSize(12)
-        table_label_font.setBold(True)
-        table_label.setFont(table_label_font)
-        layout.addWidget(table_label)
-        
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["ID", "Backend Port", "Current IP", "Country", "Status"])
-        self.table.horizontalHeader().setStretchLastSection(True)
-        self.table.setAlternatingRowColors(False)
-        layout.addWidget(self.table)
-        
-        log_label = QLabel("Log Terminal")
-        log_label_font = QFont()
-        log_label_font.setPointSize(12)
-        log_label_font.setBold(True)
-        log_label.setFont(log_label_font)
-        layout.addWidget(log_label)
-        
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        self.log_text.setMinimumHeight(200)
-        layout.addWidget(self.log_text)
-        
-        return panel
-    
-    def apply_dark_theme(self):
-        self.setStyleSheet(DARK_STYLE)
-    
-    def load_config_to_ui(self):
-        self.pool_size_spin.setValue(self.config.get("pool_size", 5))
-        self.proxy_port_input.setText(str(self.config.get("proxy_port", 8080)))
-        self.rotation_spin.setValue(self.config.get("auto_rotate_time", 0))
-        proxy_port = self.config.get("proxy_port", 8080)
-        self.info_label.setText(
-            f"Proxy Address: 127.0.0.1:{proxy_port}\n\n"
-            f"Browser Settings:\n"
-            f"HTTP Proxy: 127.0.0.1\n"
-            f"Port: {proxy_port}\n\n"
-            f"API Rotation:\n"
-            f"GET http://127.0.0.1:{proxy_port}/rotate"
-        )
-    
-    def save_config_from_ui(self):
-        self.config["pool_size"] = self.pool_size_spin.value()
-        self.config["proxy_port"] = int(self.proxy_port_input.text())
-        self.config["auto_rotate_time"] = self.rotation_spin.value()
-        self.config_manager.save(self.config)
-    
-    def log_message(self, message: str):
-        self.log_text.append(message)
-        scrollbar = self.log_text.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
-    
-    def start_system(self):
-        if self.system_running:
-            QMessageBox.warning(self, "Warning", "System is already running!")
-            return
-        
-        try:
-            pool_size = self.pool_size_spin.value()
-            proxy_port = int(self.proxy_port_input.text())
-            
-            if proxy_port < 1024 or proxy_port > 65535:
-                QMessageBox.warning(self, "Error", "Port number must be between 1024 and 65535!")
-                return
-            
-            self.save_config_from_ui()
-            
-            self.start_button.setEnabled(False)
-            self.pool_size_spin.setEnabled(False)
-            self.proxy_port_input.setEnabled(False)
-            self.rotation_spin.setEnabled(False)
-            
-            base_socks_port = self.config.get("base_socks_port", 9050)
-            base_control_port = self.config.get("base_control_port", 9051)
-            
-            self.backend_worker = BackendWorker(pool_size, proxy_port, base_socks_port, base_control_port)
-            self.backend_worker.log_signal.connect(self.log_message)
-            self.backend_worker.pool_ready_signal.connect(self.on_pool_ready)
-            self.backend_worker.error_signal.connect(self.on_backend_error)
-            self.backend_worker.start()
-            
-        except ValueError:
-            QMessageBox.warning(self, "Error", "Invalid port number!")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"System could not be started: {str(e)}")
-            self.log_message(f'<span style="color: #ff0000;">[{datetime.now().strftime("%H:%M:%S")}] ✗ ERROR: {str(e)}</span>')
-    
-    def on_pool_ready(self, pool_manager: TorPoolManager):
-        self.pool_manager = pool_manager
-        
-        self.system_running = True
-        self.status_label.setText("System Status: RUNNING")
-        self.status_label.setStyleSheet("background-color: #00aa00; color: #ffffff;")
-        self.start_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
-        self.rotate_button.setEnabled(True)
-        
-        self.update_table()
-        self.start_ip_updates()
-        
-        proxy_port = int(self.proxy_port_input.text())
-        self.info_label.setText(
-            f"Proxy Address: 127.0.0.1:{proxy_port}\n\n"
-            f"Browser Settings:\n"
-            f"HTTP Proxy: 127.0.0.1\n"
-            f"Port: {proxy_port}\n\n"
-            f"API Rotation:\n"
-            f"GET http://127.0.0.1:{proxy_port}/rotate"
-        )
-        
-        self.log_message(f'<span style="color: #00ff00;">[{datetime.now().strftime("%H:%M:%S")}] [System started]</span>')
-    
-    def check_all_ips(self):
-        """Check all IPs in parallel using QThreadPool (non-blocking)."""
-        if not self.system_running or not self.pool_manager or not self.pool_manager.instances:
-            return
-        
-        for i, instance in enumerate(self.pool_manager.instances):
-            if i not in self.worker_signals:
-                signals = WorkerSignals()
-                signals.result.connect(self.update_table_row)
-                self.worker_signals[i] = signals
-            
-            worker = IpCheckWorker(i, instance, self.worker_signals[i])
-            self.thread_pool.start(worker)
-    
-    def on_backend_error(self, error: str):
-        QMessageBox.critical(self, "Error", f"Backend error:\n{error}")
-        self.stop_system()
-    
-    def stop_system(self, force: bool = False):
-        if not self.system_running:
-            return
-        
-        self.rotation_timer.stop()
-        self.ip_check_timer.stop()
-        self.system_running = False
-        
-        self.thread_pool.waitForDone(500)
-        
-        for signals in self.worker_signals.values():
-            try:
-                signals.result.disconnect()
-            except:
-                pass
-        
-        self.worker_signals.clear()
-        
-        def stop_backend():
-            if self.backend_worker:
-                try:
-                    self.backend_worker.stop()
-                    self.backend_worker.terminate()
-                except:
-                    pass
-        
-        threading.Thread(target=stop_backend, daemon=True).start()
-        
-        self.pool_manager = None
-        self.backend_worker = None
-        
-        self.status_label.setText("System Status: IDLE")
-        self.status_label.setStyleSheet("background-color: #aa0000; color: #ffffff;")
-        self.start_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
-        self.rotate_button.setEnabled(False)
-        self.pool_size_spin.setEnabled(True)
-        self.proxy_port_input.setEnabled(True)
-        self.rotation_spin.setEnabled(True)
-        
-        self.table.setRowCount(0)
-        self.ips_ready_signal_handled = False
-        self.last_ips.clear()
-        
-        self.log_message(f'<span style="color: #00ff00;">[{datetime.now().strftime("%H:%M:%S")}] [Sistem Durduruldu]</span>')
-        QApplication.processEvents()
-    
-    def on_rotation_time_changed(self, value):
-        if self.system_running and self.ips_ready_signal_handled:
-            if value > 0:
-                if not self.rotation_timer.isActive():
-                    self.rotation_timer.start(value * 1000)
-                else:
-                    self.rotation_timer.setInterval(value * 1000)
-            else:
-                if self.rotation_timer.isActive():
-                    self.rotation_timer.stop()
-    
-    def manual_rotate_ip(self):
-        if not self.pool_manager:
-            return
-        
-        try:
-            # Pool size kontrolü
-            pool_size = len(self.pool_manager.instances)
-            
-            # Hızlı geçiş veya IP yenileme
-            new_instance = self.pool_manager.switch_to_next_instance()
-            if new_instance:
-                # Log mesajı: tek instance ise IP yenileme, çoklu ise geçiş
-                if pool_size == 1:
-                    self.log_message(f'<span style="color: #00ff00;">[{datetime.now().strftime("%H:%M:%S")}] ♻️ IP Yenileniyor -> Port: {new_instance.socks_port}</span>')
-                else:
-                    self.log_message(f'<span style="color: #00ff00;">[{datetime.now().strftime("%H:%M:%S")}] ♻️ Hızlı Geçiş Yapıldı -> Yeni Port: {new_instance.socks_port}</span>')
-            else:
-                QMessageBox.warning(self, "Hata", "IP yenileme/geçiş yapılamadı")
-        except Exception as e:
-            QMessageBox.warning(self, "Hata", f"IP işlemi hatası: {str(e)}")
-    
-    def auto_rotate_ip(self):
-        interval = self.rotation_spin.value()
-        if interval > 0 and self.system_running and self.pool_manager:
-            self.manual_rotate_ip()
-    
-    def setup_rotation_timer(self):
-        interval = self.rotation_spin.value()
-        if interval > 0:
-            if self.rotation_timer.isActive():
-                self.rotation_timer.stop()
-            self.rotation_timer.start(interval * 1000)
-        else:
-            if self.rotation_timer.isActive():
-                self.rotation_timer.stop()
-    
-    def start_ip_updates(self):
-        """Start IP checking timer with fast updates."""
-        if self.pool_manager:
-            self.check_all_ips()
-            self.ip_check_timer.start(1500)
-            QTimer.singleShot(2000, self.on_ips_ready)
-    
-    def on_ips_ready(self):
-        if not self.ips_ready_signal_handled:
-            self.ips_ready_signal_handled = True
-            self.setup_rotation_timer()
-    
-    def update_table(self):
-        if not self.pool_manager:
-            return
-        
-        self.table.setRowCount(len(self.pool_manager.instances))
-        
-        for i, instance in enumerate(self.pool_manager.instances):
-            self.table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-            self.table.setItem(i, 1, QTableWidgetItem(str(instance.socks_port)))
-            self.table.setItem(i, 2, QTableWidgetItem("Loading..."))
-            self.table.setItem(i, 3, QTableWidgetItem("Loading..."))
-            self.table.setItem(i, 4, QTableWidgetItem("⏳ Waiting"))
-    
-    def _reset_row_background(self, row: int):
-        """Reset the row background to default."""
-        if row < self.table.rowCount():
-            ip_item = self.table.item(row, 2)
-            country_item = self.table.item(row, 3)
-            if ip_item:
-                ip_item.setBackground(QColor())
-            if country_item:
-                country_item.setBackground(QColor())
-    
-    def update_table_row(self, row: int, ip: str, country: str, status: str):
-        if row < self.table.rowCount():
-            # Eski IP'yi kontrol et (görsel feedback ve log için)
-            old_ip_item = self.table.item(row, 2)
-            old_ip = old_ip_item.text() if old_ip_item else ""
-            
-            ip_item = QTableWidgetItem(ip)
-            country_item = QTableWidgetItem(country)
-            status_item = QTableWidgetItem(status)
-            
-            self.table.setItem(row, 2, ip_item)
-            self.table.setItem(row, 3, country_item)
-            self.table.setItem(row, 4, status_item)
-            
-            last_ip = self.last_ips.get(row, None)
-            if (last_ip and last_ip != ip and 
-                ip not in ("Loading...", "Unknown", "...") and 
-                last_ip not in ("Loading...", "Unknown", "...")):
-                self.log_message(f'<span style="color: #00ff00;">[{datetime.now().strftime("%H:%M:%S")}] ID: {row + 1} | IP: {ip} | Country: {country}</span>')
-                
-                ip_item.setBackground(QColor(0, 150, 0))
-                country_item.setBackground(QColor(0, 150, 0))
-                
-                QTimer.singleShot(1000, lambda: self._reset_row_background(row))
-            
-            if ip not in ("Loading...", "Unknown", "..."):
-                self.last_ips[row] = ip
-    
-    def closeEvent(self, event):
-        if self.system_running:
-            reply = QMessageBox.question(
-                self,
-                "Exit",
-                "System is running. Are you sure you want to exit?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No
-            )
-            
-            if reply == QMessageBox.Yes:
-                self.stop_system(force=True)
-                # Wait for thread pool to finish
-                self.thread_pool.waitForDone(1000)
-                self.save_config_from_ui()
-                QApplication.processEvents()
-                event.accept()
-            else:
-                event.ignore()
-        else:
-            self.save_config_from_ui()
-            event.accept()
-
-
-def main():
-    app = QApplication(sys.argv)
-    app.setStyle('Fusion')
-    
-    window = MainWindow()
-    window.setWindowTitle("MK Proxy Generator and Rotator")
-    window.show()
-    
-    sys.exit(app.exec_())
-
-
-if __name__ == "__main__":
-    main()
-
+import os
+import sys
+import json
+import time
+import logging
+import socket
+from pathlib import Path
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QLabel, QPushButton, QSpinBox, QLineEdit, QTableView,
+    QTextEdit, QGroupBox, QMessageBox
+)
+from PyQt5.QtCore import (
+    Qt, QThread, pyqtSignal, QTimer, QRunnable, QObject, QThreadPool,
+    QAbstractTableModel, QModelIndex
+)
+from PyQt5.QtGui import QFont, QColor
+
+from backend.tor_handler import TorPoolManager
+from backend.proxy_server import HybridProxyServer
+
+
+DEFAULT_CONFIG = {
+    "pool_size": 5,
+    "proxy_port": 8080,
+    "auto_rotate_time": 0,
+    "base_socks_port": 9050,
+    "base_control_port": 9051,
+    "ip_cache_ttl": 60,
+    "connection_timeout": 2.0,
+    "rotation_timeout": 10,
+    "check_interval": 1500
+}
+
+DARK_STYLE = """
+QMainWindow {
+    background-color: #1e1e1e;
+    color: #ffffff;
+}
+
+QWidget {
+    background-color: #1e1e1e;
+    color: #ffffff;
+}
+
+QGroupBox {
+    border: 2px solid #3a3a3a;
+    border-radius: 5px;
+    margin-top: 10px;
+    padding-top: 10px;
+    font-weight: bold;
+    color: #00ff00;
+}
+
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 10px;
+    padding: 0 5px;
+}
+
+QPushButton {
+    background-color: #2d2d2d;
+    border: 2px solid #3a3a3a;
+    border-radius: 5px;
+    padding: 8px;
+    font-weight: bold;
+    min-height: 30px;
+}
+
+QPushButton:hover {
+    background-color: #3a3a3a;
+    border: 2px solid #4a4a4a;
+}
+
+QPushButton:pressed {
+    background-color: #1a1a1a;
+}
+
+QPushButton#startButton {
+    background-color: #00aa00;
+    border: 2px solid #00ff00;
+    color: #ffffff;
+    font-size: 14px;
+    min-height: 40px;
+}
+
+QPushButton#startButton:hover {
+    background-color: #00cc00;
+}
+
+QPushButton#stopButton {
+    background-color: #aa0000;
+    border: 2px solid #ff0000;
+    color: #ffffff;
+    font-size: 14px;
+    min-height: 40px;
+}
+
+QPushButton#stopButton:hover {
+    background-color: #cc0000;
+}
+
+QPushButton#rotateButton {
+    background-color: #aa5500;
+    border: 2px solid #ff8800;
+    color: #ffffff;
+    font-size: 12px;
+}
+
+QPushButton#rotateButton:hover {
+    background-color: #cc6600;
+}
+
+QSpinBox, QLineEdit {
+    background-color: #2d2d2d;
+    border: 2px solid #3a3a3a;
+    border-radius: 3px;
+    padding: 5px;
+    color: #ffffff;
+}
+
+QSpinBox:hover, QLineEdit:hover {
+    border: 2px solid #4a4a4a;
+}
+
+QSpinBox:focus, QLineEdit:focus {
+    border: 2px solid #00ff00;
+}
+
+QTableView {
+    background-color: #1a1a1a;
+    border: 2px solid #3a3a3a;
+    border-radius: 5px;
+    gridline-color: #3a3a3a;
+    color: #ffffff;
+    selection-background-color: #3a3a3a;
+    alternate-background-color: #2d2d2d;
+}
+
+QTableView::item {
+    padding: 5px;
+}
+
+QTableView::item:selected {
+    background-color: #00aa00;
+}
+
+QHeaderView::section {
+    background-color: #2d2d2d;
+    color: #00ff00;
+    padding: 5px;
+    border: 1px solid #3a3a3a;
+    font-weight: bold;
+}
+
+QTextEdit {
+    background-color: #000000;
+    border: 2px solid #3a3a3a;
+    border-radius: 5px;
+    color: #00ff00;
+    font-family: 'Consolas', 'Courier New', monospace;
+    font-size: 10pt;
+}
+
+QLabel {
+    color: #ffffff;
+}
+
+QLabel#statusLabel {
+    font-weight: bold;
+    font-size: 12pt;
+    padding: 10px;
+    border-radius: 5px;
+    background-color: #2d2d2d;
+}
+
+QLabel#infoLabel {
+    background-color: #2d2d2d;
+    border: 1px solid #3a3a3a;
+    border-radius: 3px;
+    padding: 8px;
+    color: #00ff00;
+}
+"""
+
+
+# Log line template, interned once; every call site used to rebuild the
+# span markup inline with a fresh strftime.
+logger = logging.getLogger(__name__)
+
+LOG_TEMPLATE = '<span style="color: %s;">[%s] %s</span>'
+LOG_GREEN = "#00ff00"
+LOG_RED = "#ff0000"
+
+
+# Timestamps have second resolution, so strftime only needs to run when
+# the second actually changes; bursts of log lines share the string.
+_ts_cache = ("", -1)
+
+
+def _timestamp() -> str:
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    if _ts_cache[1] != sec:
+        _ts_cache = (time.strftime("%H:%M:%S", time.localtime(now)), sec)
+    return _ts_cache[0]
+
+
+def format_log(message: str, color: str = LOG_GREEN) -> str:
+    return LOG_TEMPLATE % (color, _timestamp(), message)
+
+
+class ConfigManager:
+    def __init__(self, config_path: str = "config.json"):
+        self.config_path = Path(config_path)
+        self.default_config = DEFAULT_CONFIG.copy()
+        self._cached_config = None
+        self._cached_mtime = None
+
+    def load(self) -> dict:
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except OSError:
+            return self.default_config.copy()
+        # Re-parse only when the file actually changed on disk.
+        if self._cached_config is not None and mtime == self._cached_mtime:
+            return self._cached_config.copy()
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = {**self.default_config, **json.load(f)}
+            self._cached_config = config
+            self._cached_mtime = mtime
+            return config.copy()
+        except Exception:
+            return self.default_config.copy()
+    
+    def save(self, config: dict):
+        try:
+            # Serialize to bytes in one shot and swap the file in place;
+            # os.replace is atomic, so a crash mid-save can never leave a
+            # truncated config.json behind.
+            payload = json.dumps(config, indent=4).encode('utf-8')
+            tmp_path = self.config_path.with_name(self.config_path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.config_path)
+            self._cached_config = dict(config)
+            self._cached_mtime = self.config_path.stat().st_mtime
+        except Exception as e:
+            # print() can block indefinitely when stdout is a dead pipe
+            # (e.g. frozen build with a closed console); logging cannot.
+            logger.warning("Config save error: %s", e)
+
+
+class BackendWorker(QThread):
+    """Hosts the whole backend on one QThread.
+
+    The thread starts the Tor pool and then runs the proxy's asyncio
+    event loop via serve_forever(); connections are coroutines on that
+    loop, so no thread is ever created per connection and the Qt main
+    thread only talks to this worker through signals.
+    """
+    log_signal = pyqtSignal(str)
+    pool_ready_signal = pyqtSignal(object)
+    error_signal = pyqtSignal(str)
+    
+    def __init__(self, pool_size: int, proxy_port: int, base_socks_port: int, base_control_port: int):
+        super().__init__()
+        self.pool_size = pool_size
+        self.proxy_port = proxy_port
+        self.base_socks_port = base_socks_port
+        self.base_control_port = base_control_port
+        self.pool_manager = None
+        self.proxy_server = None
+        self.running = False
+    
+    def run(self):
+        try:
+            self.running = True
+            self.pool_manager = TorPoolManager(
+                count=self.pool_size,
+                base_socks_port=self.base_socks_port,
+                base_control_port=self.base_control_port
+            )
+            
+            try:
+                self.pool_manager.start_pool()
+            except Exception as e:
+                error_msg = format_log(f"✗ Pool start error: {str(e)}", LOG_RED)
+                self.log_signal.emit(error_msg)
+                self.error_signal.emit(str(e))
+                return
+            
+            if not self.pool_manager.instances:
+                error_msg = format_log("✗ Tor instances could not be started", LOG_RED)
+                self.log_signal.emit(error_msg)
+                self.error_signal.emit("No Tor instances started")
+                return
+            
+            self.log_signal.emit(format_log(f"[Pool ready - {len(self.pool_manager.instances)} instances]"))
+            
+            try:
+                self.proxy_server = HybridProxyServer(
+                    pool_manager=self.pool_manager,
+                    host='127.0.0.1',
+                    port=self.proxy_port,
+                    log_callback=self.log_signal.emit
+                )
+                self.log_signal.emit(format_log(f"[Proxy server started - 127.0.0.1:{self.proxy_port}]"))
+            except Exception as e:
+                error_msg = format_log(f"✗ Proxy server start error: {str(e)}", LOG_RED)
+                self.log_signal.emit(error_msg)
+                self.error_signal.emit(f"Proxy server error: {str(e)}")
+                return
+            
+            self.pool_ready_signal.emit(self.pool_manager)
+
+            # Runs the asyncio event loop until stop() is called.
+            self.proxy_server.serve_forever()
+        except Exception as e:
+            if self.running:
+                error_msg = format_log(f"✗ ERROR: {str(e)}", LOG_RED)
+                self.log_signal.emit(error_msg)
+                self.error_signal.emit(str(e))
+        finally:
+            # Pool teardown happens on this thread, whichever way run()
+            # exits, so stop() never has to block the GUI on it.
+            if self.pool_manager:
+                try:
+                    self.pool_manager.stop_pool()
+                except Exception:
+                    pass
+
+    def stop(self):
+        """Non-blocking: nudges the event loop to exit; run() cleans up."""
+        self.running = False
+        if self.proxy_server:
+            try:
+                self.proxy_server.stop()
+            except:
+                pass
+    
+
+
+class WorkerSignals(QObject):
+    """Signals for IP check workers."""
+    result = pyqtSignal(int, str, str, str)  # row, ip, country, status
+
+
+class IpCheckWorker(QRunnable):
+    """High-performance QRunnable for checking a single Tor instance IP."""
+    
+    def __init__(self, row: int, instance, signals: WorkerSignals):
+        super().__init__()
+        self.row = row
+        self.instance = instance
+        self.signals = signals
+    
+    def _is_valid_ip(self, ip_str):
+        """Basic IP validation via the C parser instead of split/int loops."""
+        if not ip_str or ip_str in ("Unknown", "Loading...", "Ready", "...", "-", "Preparing"):
+            return False
+        if ip_str.count('.') != 3:
+            # inet_aton also accepts short forms like "1.2.3"; reject those.
+            return False
+        try:
+            socket.inet_aton(ip_str)
+            return True
+        except OSError:
+            return False
+    
+    def run(self):
+        """Execute IP check with caching and parallelization."""
+        try:
+            # Fresh cached IP: answer without touching the circuit at all.
+            if not self.instance.has_fresh_ip():
+                # Blocks on the event the bootstrap sets instead of a
+                # 0.5s polling loop; wakes the instant the circuit is up.
+                # On timeout get_ip() still runs and reports Connecting.
+                self.instance.circuit_ready_event.wait(timeout=5)
+
+            ip = self.instance.get_ip(max_retries=3, retry_delay=1)
+
+            if ip and self._is_valid_ip(ip):
+                country = self.instance.get_country(ip)
+                status = "🟢 Ready"
+            else:
+                # "..." and every other non-IP answer mean the same thing:
+                # the circuit is not serving yet.
+                ip = "Loading..."
+                country = "Loading..."
+                status = "🟡 Connecting"
+
+            try:
+                self.signals.result.emit(self.row, ip, country, status)
+            except RuntimeError:
+                pass
+        except Exception:
+            try:
+                self.signals.result.emit(self.row, "...", "-", "🔴 Error")
+            except RuntimeError:
+                pass
+
+
+class InstanceTableModel(QAbstractTableModel):
+    """Model behind the instance table.
+
+    Rows live in plain Python lists; a refresh touches only the cells
+    that changed and emits one dataChanged per row, instead of the
+    QTableWidget path that rebuilt a QTableWidgetItem per cell."""
+
+    HEADERS = ("ID", "Backend Port", "Current IP", "Country", "Status")
+    HIGHLIGHT_COLOR = QColor(0, 150, 0)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        # Rows flashed green after an IP change; served via BackgroundRole.
+        self._highlighted = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        if (role == Qt.BackgroundRole and index.row() in self._highlighted
+                and index.column() in (2, 3)):
+            return self.HIGHLIGHT_COLOR
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def set_instances(self, instances):
+        """Full reset: one row per instance, all in the Loading state."""
+        self.beginResetModel()
+        self._rows = [
+            [str(i + 1), str(inst.socks_port), "Loading...", "Loading...", "⏳ Waiting"]
+            for i, inst in enumerate(instances)
+        ]
+        self._highlighted.clear()
+        self.endResetModel()
+
+    def update_row(self, row: int, ip: str, country: str, status: str):
+        cells = self._rows[row]
+        cells[2], cells[3], cells[4] = ip, country, status
+        self.dataChanged.emit(self.index(row, 2), self.index(row, 4), [Qt.DisplayRole])
+
+    def set_highlight(self, row: int, on: bool):
+        if on:
+            self._highlighted.add(row)
+        else:
+            self._highlighted.discard(row)
+        if row < len(self._rows):
+            self.dataChanged.emit(self.index(row, 2), self.index(row, 3), [Qt.BackgroundRole])
+
+
+class MainWindow(QMainWindow):
+    # Shared fonts for the panel headers. Filled on first construction
+    # rather than at import, since QFont needs the QApplication alive.
+    TITLE_FONT = None
+    SECTION_FONT = None
+
+    @staticmethod
+    def _make_bold_font(point_size: int) -> QFont:
+        font = QFont()
+        font.setPointSize(point_size)
+        font.setBold(True)
+        return font
+
+    def __init__(self):
+        super().__init__()
+        if MainWindow.TITLE_FONT is None:
+            MainWindow.TITLE_FONT = self._make_bold_font(14)
+            MainWindow.SECTION_FONT = self._make_bold_font(12)
+        self.config_manager = ConfigManager()
+        self.config = self.config_manager.load()
+        
+        self.backend_worker = None
+        self.pool_manager = None
+        self.system_running = False
+        self.ips_ready_signal_handled = False
+        self.rotation_timer = QTimer()
+        self.rotation_timer.timeout.connect(self.auto_rotate_ip)
+        self.ip_check_timer = QTimer()
+        self.ip_check_timer.timeout.connect(self.check_all_ips)
+        self.thread_pool = QThreadPool.globalInstance()
+        self.thread_pool.setMaxThreadCount(15)
+        self.last_ips = {}
+        # One emitter for every IP check worker; the row travels in the
+        # signal payload, so per-row QObject instances buy nothing.
+        self.worker_signals = WorkerSignals()
+        self.worker_signals.result.connect(self.update_table_row)
+        # Rows flashed green after an IP change, reset together by one
+        # timer instead of a lambda closure per row.
+        self._highlight_rows = set()
+        # Rows with an IpCheckWorker already queued or running; the 1.5 s
+        # poll must not stack a second worker behind a slow check.
+        self._inflight_rows = set()
+        self._highlight_timer = QTimer()
+        self._highlight_timer.setSingleShot(True)
+        self._highlight_timer.setInterval(1000)
+        self._highlight_timer.timeout.connect(self._clear_highlights)
+        # Log appends are coalesced: every QTextEdit.append reparses its
+        # HTML on the GUI thread, so bursts (pool start, rotation) are
+        # buffered and flushed as a single append per ~100ms tick.
+        self._log_buffer = []
+        self._log_flush_timer = QTimer()
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(100)
+        self._log_flush_timer.timeout.connect(self._flush_log)
+        
+        self.init_ui()
+        self.load_config_to_ui()
+    
+    def init_ui(self):
+        self.setWindowTitle("MK Proxy Generator and Rotator")
+        self.setGeometry(100, 100, 1400, 800)
+        
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        main_layout = QHBoxLayout()
+        central_widget.setLayout(main_layout)
+        
+        left_panel = self.create_left_panel()
+        right_panel = self.create_right_panel()
+        
+        main_layout.addWidget(left_panel, 1)
+        main_layout.addWidget(right_panel, 2)
+    
+    def create_left_panel(self):
+        panel = QWidget()
+        layout = QVBoxLayout()
+        panel.setLayout(layout)
+        
+        title = QLabel("Proxy Configuration")
+        title.setFont(self.TITLE_FONT)
+        title.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title)
+        
+        config_group = QGroupBox("Settings")
+        config_layout = QVBoxLayout()
+        
+        pool_size_layout = QHBoxLayout()
+        pool_size_layout.addWidget(QLabel("Pool Size:"))
+        self.pool_size_spin = QSpinBox()
+        self.pool_size_spin.setRange(1, 10)
+        self.pool_size_spin.setValue(self.config.get("pool_size", 5))
+        self.pool_size_spin.setEnabled(not self.system_running)
+        pool_size_layout.addWidget(self.pool_size_spin)
+        config_layout.addLayout(pool_size_layout)
+        
+        proxy_port_layout = QHBoxLayout()
+        proxy_port_layout.addWidget(QLabel("Proxy Port:"))
+        self.proxy_port_input = QLineEdit()
+        self.proxy_port_input.setText(str(self.config.get("proxy_port", 8080)))
+        self.proxy_port_input.setEnabled(not self.system_running)
+        proxy_port_layout.addWidget(self.proxy_port_input)
+        config_layout.addLayout(proxy_port_layout)
+        
+        rotation_layout = QHBoxLayout()
+        rotation_layout.addWidget(QLabel("Auto Rotate Time (sec):"))
+        self.rotation_spin = QSpinBox()
+        self.rotation_spin.setRange(0, 3600)
+        self.rotation_spin.setValue(self.config.get("auto_rotate_time", 0))
+        self.rotation_spin.setSpecialValueText("Off/Manual")
+        self.rotation_spin.setEnabled(not self.system_running)
+        self.rotation_spin.valueChanged.connect(self.on_rotation_time_changed)
+        rotation_layout.addWidget(self.rotation_spin)
+        config_layout.addLayout(rotation_layout)
+        
+        config_group.setLayout(config_layout)
+        layout.addWidget(config_group)
+        
+        button_group = QGroupBox("Control")
+        button_layout = QVBoxLayout()
+        
+        self.start_button = QPushButton("Start")
+        self.start_button.setObjectName("startButton")
+        self.start_button.clicked.connect(self.start_system)
+        button_layout.addWidget(self.start_button)
+        
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setObjectName("stopButton")
+        self.stop_button.clicked.connect(self.stop_system)
+        self.stop_button.setEnabled(False)
+        button_layout.addWidget(self.stop_button)
+        
+        self.rotate_button = QPushButton("Change IP (Manual)")
+        self.rotate_button.setObjectName("rotateButton")
+        self.rotate_button.clicked.connect(self.manual_rotate_ip)
+        self.rotate_button.setEnabled(False)
+        button_layout.addWidget(self.rotate_button)
+        
+        button_group.setLayout(button_layout)
+        layout.addWidget(button_group)
+        
+        info_group = QGroupBox("Connection Info")
+        info_layout = QVBoxLayout()
+        
+        self.info_label = QLabel("Proxy Address: 127.0.0.1:8080")
+        self.info_label.setObjectName("infoLabel")
+        self.info_label.setWordWrap(True)
+        info_layout.addWidget(self.info_label)
+        
+        info_group.setLayout(info_layout)
+        layout.addWidget(info_group)
+        
+        status_group = QGroupBox("Status")
+        status_layout = QVBoxLayout()
+        
+        self.status_label = QLabel("System Status: IDLE")
+        self.status_label.setObjectName("statusLabel")
+        self.status_label.setStyleSheet("background-color: #aa0000; color: #ffffff;")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        status_layout.addWidget(self.status_label)
+        
+        status_group.setLayout(status_layout)
+        layout.addWidget(status_group)
+        
+        layout.addStretch()
+        
+        return panel
+    
+    def create_right_panel(self):
+        panel = QWidget()
+        layout = QVBoxLayout()
+        panel.setLayout(layout)
+        
+        table_label = QLabel("Instance List")
+        table_label.setFont(self.SECTION_FONT)
+        layout.addWidget(table_label)
+        
+        self.table_model = InstanceTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setAlternatingRowColors(False)
+        layout.addWidget(self.table)
+        
+        log_label = QLabel("Log Terminal")
+        log_label.setFont(self.SECTION_FONT)
+        layout.addWidget(log_label)
+        
+        self.log_text = QTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setMinimumHeight(200)
+        # Drop the oldest lines past 1000 blocks; an unbounded document
+        # grows without limit on long sessions and slows every append.
+        self.log_text.document().setMaximumBlockCount(1000)
+        layout.addWidget(self.log_text)
+        
+        return panel
+    
+    def load_config_to_ui(self):
+        self.pool_size_spin.setValue(self.config.get("pool_size", 5))
+        self.proxy_port_input.setText(str(self.config.get("proxy_port", 8080)))
+        self.rotation_spin.setValue(self.config.get("auto_rotate_time", 0))
+        proxy_port = self.config.get("proxy_port", 8080)
+        self.info_label.setText(
+            f"Proxy Address: 127.0.0.1:{proxy_port}\n\n"
+            f"Browser Settings:\n"
+            f"HTTP Proxy: 127.0.0.1\n"
+            f"Port: {proxy_port}\n\n"
+            f"API Rotation:\n"
+            f"GET http://127.0.0.1:{proxy_port}/rotate"
+        )
+    
+    def save_config_from_ui(self):
+        self.config["pool_size"] = self.pool_size_spin.value()
+        self.config["proxy_port"] = int(self.proxy_port_input.text())
+        self.config["auto_rotate_time"] = self.rotation_spin.value()
+        self.config_manager.save(self.config)
+    
+    def log_message(self, message: str):
+        self._log_buffer.append(message)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
+
+    def _flush_log(self):
+        if not self._log_buffer:
+            return
+        lines = self._log_buffer
+        self._log_buffer = []
+        self.log_text.append("<br>".join(lines))
+        scrollbar = self.log_text.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+    
+    def start_system(self):
+        if self.system_running:
+            QMessageBox.warning(self, "Warning", "System is already running!")
+            return
+        
+        try:
+            pool_size = self.pool_size_spin.value()
+            proxy_port = int(self.proxy_port_input.text())
+            
+            if proxy_port < 1024 or proxy_port > 65535:
+                QMessageBox.warning(self, "Error", "Port number must be between 1024 and 65535!")
+                return
+            
+            self.save_config_from_ui()
+            
+            self.start_button.setEnabled(False)
+            self.pool_size_spin.setEnabled(False)
+            self.proxy_port_input.setEnabled(False)
+            self.rotation_spin.setEnabled(False)
+            
+            base_socks_port = self.config.get("base_socks_port", 9050)
+            base_control_port = self.config.get("base_control_port", 9051)
+            
+            self.backend_worker = BackendWorker(pool_size, proxy_port, base_socks_port, base_control_port)
+            self.backend_worker.log_signal.connect(self.log_message)
+            self.backend_worker.pool_ready_signal.connect(self.on_pool_ready)
+            self.backend_worker.error_signal.connect(self.on_backend_error)
+            self.backend_worker.start()
+            
+        except ValueError:
+            QMessageBox.warning(self, "Error", "Invalid port number!")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"System could not be started: {str(e)}")
+            self.log_message(format_log(f"✗ ERROR: {str(e)}", LOG_RED))
+    
+    def on_pool_ready(self, pool_manager: TorPoolManager):
+        self.pool_manager = pool_manager
+        
+        self.system_running = True
+        self.status_label.setText("System Status: RUNNING")
+        self.status_label.setStyleSheet("background-color: #00aa00; color: #ffffff;")
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.rotate_button.setEnabled(True)
+        
+        self.update_table()
+        self.start_ip_updates()
+        
+        proxy_port = int(self.proxy_port_input.text())
+        self.info_label.setText(
+            f"Proxy Address: 127.0.0.1:{proxy_port}\n\n"
+            f"Browser Settings:\n"
+            f"HTTP Proxy: 127.0.0.1\n"
+            f"Port: {proxy_port}\n\n"
+            f"API Rotation:\n"
+            f"GET http://127.0.0.1:{proxy_port}/rotate"
+        )
+        
+        self.log_message(format_log("[System started]"))
+    
+    def check_all_ips(self):
+        """Check all IPs in parallel using QThreadPool (non-blocking)."""
+        if not self.system_running or not self.pool_manager or not self.pool_manager.instances:
+            return
+        
+        for i, instance in enumerate(self.pool_manager.instances):
+            if i in self._inflight_rows:
+                continue
+            self._inflight_rows.add(i)
+            worker = IpCheckWorker(i, instance, self.worker_signals)
+            self.thread_pool.start(worker)
+    
+    def on_backend_error(self, error: str):
+        QMessageBox.critical(self, "Error", f"Backend error:\n{error}")
+        self.stop_system()
+    
+    def stop_system(self, force: bool = False):
+        if not self.system_running:
+            return
+        
+        self.rotation_timer.stop()
+        self.ip_check_timer.stop()
+        self.system_running = False
+        
+        self.thread_pool.waitForDone(500)
+
+        if self.backend_worker:
+            try:
+                self.backend_worker.stop()
+                if not self.backend_worker.wait(3000):
+                    # Pool teardown is still running; let the thread
+                    # delete itself when it finishes instead of
+                    # terminate()'ing it mid-cleanup.
+                    self.backend_worker.finished.connect(self.backend_worker.deleteLater)
+            except:
+                pass
+
+        self.pool_manager = None
+        self.backend_worker = None
+        
+        self.status_label.setText("System Status: IDLE")
+        self.status_label.setStyleSheet("background-color: #aa0000; color: #ffffff;")
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.rotate_button.setEnabled(False)
+        self.pool_size_spin.setEnabled(True)
+        self.proxy_port_input.setEnabled(True)
+        self.rotation_spin.setEnabled(True)
+        
+        self.table_model.set_instances([])
+        self.ips_ready_signal_handled = False
+        self.last_ips.clear()
+        self._inflight_rows.clear()
+        
+        # No processEvents() here: stop_system runs on the GUI thread, so
+        # the repaint happens as soon as it returns to the event loop.
+        # Re-entering the loop mid-teardown could dispatch queued worker
+        # signals against half-cleared state.
+        self.log_message(format_log("[Sistem Durduruldu]"))
+    
+    def on_rotation_time_changed(self, value):
+        if self.system_running and self.ips_ready_signal_handled:
+            if value > 0:
+                if not self.rotation_timer.isActive():
+                    self.rotation_timer.start(value * 1000)
+                else:
+                    self.rotation_timer.setInterval(value * 1000)
+            else:
+                if self.rotation_timer.isActive():
+                    self.rotation_timer.stop()
+    
+    def manual_rotate_ip(self):
+        if not self.pool_manager:
+            return
+        
+        try:
+            # Pool size kontrolü
+            pool_size = len(self.pool_manager.instances)
+            
+            # Hızlı geçiş veya IP yenileme
+            new_instance = self.pool_manager.switch_to_next_instance()
+            if new_instance:
+                # Log mesajı: tek instance ise IP yenileme, çoklu ise geçiş
+                if pool_size == 1:
+                    self.log_message(format_log(f"♻️ IP Yenileniyor -> Port: {new_instance.socks_port}"))
+                else:
+                    self.log_message(format_log(f"♻️ Hızlı Geçiş Yapıldı -> Yeni Port: {new_instance.socks_port}"))
+            else:
+                QMessageBox.warning(self, "Hata", "IP yenileme/geçiş yapılamadı")
+        except Exception as e:
+            QMessageBox.warning(self, "Hata", f"IP işlemi hatası: {str(e)}")
+    
+    def auto_rotate_ip(self):
+        interval = self.rotation_spin.value()
+        if interval > 0 and self.system_running and self.pool_manager:
+            self.manual_rotate_ip()
+    
+    def setup_rotation_timer(self):
+        interval = self.rotation_spin.value()
+        if interval > 0:
+            if self.rotation_timer.isActive():
+                self.rotation_timer.stop()
+            self.rotation_timer.start(interval * 1000)
+        else:
+            if self.rotation_timer.isActive():
+                self.rotation_timer.stop()
+    
+    def start_ip_updates(self):
+        """Start IP checking timer with fast updates."""
+        if self.pool_manager:
+            self.check_all_ips()
+            self.ip_check_timer.start(1500)
+            QTimer.singleShot(2000, self.on_ips_ready)
+    
+    def on_ips_ready(self):
+        if not self.ips_ready_signal_handled:
+            self.ips_ready_signal_handled = True
+            self.setup_rotation_timer()
+    
+    def update_table(self):
+        if not self.pool_manager:
+            return
+
+        self.table_model.set_instances(self.pool_manager.instances)
+
+    def _clear_highlights(self):
+        for row in self._highlight_rows:
+            self.table_model.set_highlight(row, False)
+        self._highlight_rows.clear()
+
+    def update_table_row(self, row: int, ip: str, country: str, status: str):
+        self._inflight_rows.discard(row)
+        if row < self.table_model.rowCount():
+            self.table_model.update_row(row, ip, country, status)
+
+            last_ip = self.last_ips.get(row, None)
+            if (last_ip and last_ip != ip and
+                ip not in ("Loading...", "Unknown", "...") and
+                last_ip not in ("Loading...", "Unknown", "...")):
+                self.log_message(format_log(f"ID: {row + 1} | IP: {ip} | Country: {country}"))
+
+                self.table_model.set_highlight(row, True)
+                self._highlight_rows.add(row)
+                if not self._highlight_timer.isActive():
+                    self._highlight_timer.start()
+
+            if ip not in ("Loading...", "Unknown", "..."):
+                self.last_ips[row] = ip
+    
+    def closeEvent(self, event):
+        if self.system_running:
+            reply = QMessageBox.question(
+                self,
+                "Exit",
+                "System is running. Are you sure you want to exit?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            
+            if reply == QMessageBox.Yes:
+                self.stop_system(force=True)
+                # Wait for thread pool to finish
+                self.thread_pool.waitForDone(1000)
+                self._flush_log()
+                self.save_config_from_ui()
+                QApplication.processEvents()
+                event.accept()
+            else:
+                event.ignore()
+        else:
+            self.save_config_from_ui()
+            event.accept()
+
+
+def main():
+    app = QApplication(sys.argv)
+    app.setStyle('Fusion')
+    # Parse the QSS once at application scope; a per-window setStyleSheet
+    # recompiles the whole sheet for every window constructed.
+    app.setStyleSheet(DARK_STYLE)
+
+    window = MainWindow()
+    window.setWindowTitle("MK Proxy Generator and Rotator")
+    window.show()
+    
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
+